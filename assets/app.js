@@ -54,19 +54,21 @@
     console.log(payload)
     console.log(window.location.href)
 
-    // GOAL 범위 검증 (1~20)
-    if (payload.GOAL < 1 || payload.GOAL > 20) {
-      throw new Error(`GOAL must be between 1 and 20. Current value: ${payload.GOAL}`);
+    // GOAL 범위 검증 (1~200, 21 이상은 서버에서 유도)
+    if (payload.GOAL < 1 || payload.GOAL > 200) {
+      throw new Error(`GOAL must be between 1 and 200. Current value: ${payload.GOAL}`);
     }
 
     const fetchStartTime = performance.now();
-    const res = await fetch("/api/simulate", {
-      method: "POST",
-      headers: {
-        "content-type": "application/json",
-        "accept": "application/json"
-      },
-      body: JSON.stringify(payload),
+    // GET: 같은 (GAME_ID, GOAL, OBS_TOTAL)은 브라우저 캐시(ETag 재검증)/엣지 캐시에서 응답
+    const query = new URLSearchParams({
+      game: String(payload.GAME_ID),
+      goal: String(payload.GOAL),
+      obs: String(payload.OBS_TOTAL),
+    });
+    const res = await fetch(`/api/simulate?${query}`, {
+      method: "GET",
+      headers: { "accept": "application/json" },
     });
     const fetchEndTime = performance.now();
     console.log("res : ")
@@ -114,15 +116,13 @@
     console.log(`⏱️ Total client duration: ${(clientEndTime - clientStartTime).toFixed(2)} ms`);
     console.log("----------------------------------------");
 
-    if (data.timings) {
+    // 서버 단계별 시간: Server-Timing 헤더 ("load;dur=1.20, compute.svg;dur=0.35, total;dur=1.90")
+    const serverTiming = parseServerTiming(res.headers.get("Server-Timing"));
+    if (serverTiming.length) {
       console.log("🖥️  SERVER TIMING BREAKDOWN:");
       console.log("----------------------------------------");
-
-      // 키를 정렬하여 순서대로 출력
-      const sortedKeys = Object.keys(data.timings).sort();
-      sortedKeys.forEach(key => {
-        const value = data.timings[key];
-        console.log(`  ${key}: ${value.toFixed(3)} ms`);
+      serverTiming.forEach(({ name, dur }) => {
+        console.log(`  ${name}: ${dur.toFixed(3)} ms`);
       });
       console.log("========================================");
     }
@@ -130,6 +130,15 @@
     return data;
   }
 
+  function parseServerTiming(header) {
+    if (!header) return [];
+    return header.split(",").map(entry => {
+      const [name, ...params] = entry.trim().split(";");
+      const dur = params.find(p => p.trim().startsWith("dur="));
+      return { name, dur: dur ? parseFloat(dur.trim().slice(4)) : 0 };
+    }).filter(({ name }) => name);
+  }
+
   function setPlotFromSvg(svgText) {
     const url = URL.createObjectURL(
       new Blob([svgText], { type: "image/svg+xml;charset=utf-8" })
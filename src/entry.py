@@ -1,55 +1,168 @@
 # -*- coding: utf-8 -*-
 from workers import WorkerEntrypoint, Response, Request
-from urllib.parse import urlparse
+from urllib.parse import parse_qs, urlparse
+import asyncio
 import json
+import time
+import traceback
+
+# 서빙 모듈은 isolate 초기화 시 1회 import (메모리 스냅샷에 포함, 요청 경로에서 import 없음)
+# GAME_TABLE 기반 pity 테이블(compute)과 추가 에피소드 혼합 커널(exact)도 이때 계산됩니다.
+from logic import datasource, edge_cache, metrics, tracing
+from logic.compute import GAME_TABLE, PLAN_GOALS, evaluate_batch, plan_budget, quantile_table, run_simulation
+from logic.exact import DERIVE_MAX_GOAL, derive_precomputed, is_exact_method
+from logic.loader import data_version
 
 # 공통 헤더(필요 시 도메인으로 제한하세요)
 CORS = {
     "Access-Control-Allow-Origin": "*",
     "Access-Control-Allow-Methods": "GET,POST,OPTIONS",
     "Access-Control-Allow-Headers": "Content-Type",
+    "Access-Control-Expose-Headers": "Server-Timing, ETag",
 }
 
+BATCH_MAX_QUERIES = 1000  # /api/simulate/batch 요청당 최대 쿼리 수
+QUANTILES_MAX_Q = 32      # /api/quantiles 요청당 최대 확률 수
+QUANTILES_DEFAULT_Q = (0.5, 0.9, 0.99)
+# 분포는 배포 단위로 고정이므로 조회 API 응답은 브라우저/CDN 캐시 허용
+QUERY_CACHE_CONTROL = "public, max-age=3600"
+# GET /api/simulate: 브라우저/CDN은 하루 (재배포 후에도 ETag로 재검증),
+# colo Cache API 사본은 키에 데이터 버전이 들어가므로 1년 보관
+SIMULATE_CACHE_CONTROL = "public, max-age=86400"
+EDGE_CACHE_CONTROL = "public, max-age=31536000"
+# 응답 형식/계산 방식이 바뀌면 올리세요 (ETag가 달라져 이전 캐시 응답이 재사용되지 않음)
+SIMULATE_RESPONSE_VERSION = "1"
+
+
 class Default(WorkerEntrypoint):
+    def _defer(self, coro):
+        """응답을 막지 않고 백그라운드로 실행 (ctx.waitUntil)"""
+        task = asyncio.ensure_future(coro)
+        ctx = getattr(self, "ctx", None)
+        if ctx is not None:
+            ctx.waitUntil(task)
+        return task
+
+    async def _load_distribution(self, game_id, goal):
+        """(game_id, goal) 분포 로드: 계층형 캐시(메모리 → Cache API → Assets → KV) → 런타임 유도
+
+        Returns:
+            (precomputed_data, 출처 설명, 정확한 분포 여부) 또는 (None, None, False)
+            정규분포 근사로 유도된 분포는 isolate마다 달라질 수 있으므로 HTTP/엣지 캐시에 넣지 않습니다.
+
+        Raises:
+            ValueError: 알 수 없는 game_id 또는 범위 밖 goal (어떤 데이터 계층도 조회하기 전에 거부)
+        """
+        datasource.validate_key(game_id, goal)
+        with tracing.span("load"):
+            precomputed_data, tier = await datasource.load_precomputed(self.env, game_id, goal, defer=self._defer)
+        if precomputed_data:
+            return precomputed_data, f"precomputed ({tier})", True
+
+        # 에셋에 없는 goal은 PMF 합성곱으로 유도 (isolate 메모, 몬테카를로 없음)
+        if 1 <= goal <= DERIVE_MAX_GOAL:
+            with tracing.span("derive"):
+                precomputed_data, method = derive_precomputed(game_id, goal)
+            return precomputed_data, f"derived ({method})", is_exact_method(method)
+        return None, None, False
+
+    async def _simulate(self, request_id, game_id, goal, obs_tot):
+        """단일 시뮬레이션 → (응답 dict, HTTP 상태, 캐시 가능 여부) (POST/GET /api/simulate 공용)
+
+        근사 분포로 계산한 응답은 본문에 "approximate": true를 넣고 캐시 불가로 반환합니다.
+        """
+        try:
+            # Assets에서 사전 계산된 데이터 로드 (~1-3ms), 없는 goal은 런타임 유도
+            precomputed_data, data_source, exact = await self._load_distribution(game_id, goal)
+
+            # 데이터가 없으면 에러 반환 (실시간 시뮬레이션 비활성화)
+            if not precomputed_data:
+                return {
+                    "ok": False,
+                    "error": f"No precomputed data for game_id={game_id}, goal={goal}. Please use goal between 1-{DERIVE_MAX_GOAL}."
+                }, 400, False
+
+            # 시뮬레이션 실행 (단계별 span: compute.validate / compute.summarize / compute.svg)
+            with tracing.span("compute"):
+                summary, svg = run_simulation(
+                    game_id=game_id,
+                    goal=goal,
+                    obs_total=obs_tot,
+                    precomputed_data=precomputed_data
+                )
+        except Exception as e:
+            error_details = traceback.format_exc()
+            print(f"[Error #{request_id}] {error_details}")
+            return {"ok": False, "error": "01_ "+str(e)}, 400, False
+        try:
+            print(f"[Request #{request_id}] game_id={game_id}, goal={goal}, obs_total={obs_tot} ({data_source})")
+            print(f"Summary: {summary.get('percentile_rank_of_obs_%', 'N/A')}")
+        except Exception as e:
+            error_details = traceback.format_exc()
+            print(f"[Error #{request_id}] {error_details}")
+            return {"ok": False, "error": "02_ "+str(e)}, 400, False
+
+        # 권장: base64 data URL 대신 '생 SVG 문자열'을 그대로 전달
+        # 프런트에서 Blob(URL.createObjectURL)로 <img src>에 붙이세요.
+        # 단계별 시간은 본문 대신 Server-Timing 헤더로 전달
+        payload = {"ok": True, "summary": summary, "image_svg": svg}
+        if not exact:
+            payload["approximate"] = True
+        return payload, 200, exact
+
     async def fetch(self, request):
+        # 요청 처리 시간 기록 (isolate 첫 요청 vs 이후 요청 비교용)
+        path = urlparse(request.url).path
+        is_api = path.startswith("/api/")
+        t_start = time.perf_counter()
+
+        # API 요청만 span 트레이싱 (wrangler.toml [vars] TRACING = "0"이면 비활성화)
+        # MEMPROFILE = "1"이면 span별 피크/잔존 메모리도 측정 (tracemalloc, 진단용)
+        if not tracing.memory_profiling_enabled() and getattr(self.env, "MEMPROFILE", "0") == "1":
+            tracing.enable_memory_profiling()
+        trace = tracing.begin() if is_api and getattr(self.env, "TRACING", "1") != "0" else None
+        try:
+            response = await self._route(request, path)
+            if trace is not None:
+                response.headers.set("Server-Timing", trace.header())
+            return response
+        finally:
+            tracing.end(trace, route=metrics.route_key(request.method, path))
+            metrics.record_request_time(path, (time.perf_counter() - t_start) * 1000)
+
+    async def _route(self, request, path):
         # 서버 변수
         store = self.env.GLOBAL_STORE
-        count = int(await store.get("count") or "0")
-        count += 1
-        await store.put("count", str(count))
+
+        # 요청 카운트: isolate 메모리에서 집계, KV에는 주기적으로 증가분만 반영
+        request_id = metrics.record_request(request.method, path)
+        if metrics.flush_due():
+            self._defer(metrics.flush(store))
 
         # CORS 프리플라이트
         if request.method == "OPTIONS":
             return Response("", headers=CORS)
 
-        path = urlparse(request.url).path
-
         # 헬스체크
         if path == "/api/health":
-            return Response.json({"ok": True}, headers=CORS)
+            return Response.json({"ok": True, "startup": metrics.startup_snapshot()}, headers=CORS)
+
+        # isolate 통계: span별 롤링 p50/p95/p99 + 데이터 계층별 hit/miss + 요청 집계
+        if path == "/api/stats":
+            stats = {"ok": True, "spans": tracing.stats(), "tiers": datasource.stats(), "requests": metrics.snapshot()}
+            if tracing.memory_profiling_enabled():
+                stats["memory"] = tracing.memory_stats()
+            return Response.json(stats, headers=CORS)
 
         # 시뮬레이션 API
         # POST /api/simulate
         # body: { "GAME_ID": 1, "GOAL": 7, "OBS_TOTAL": 888, "N_SIMS"?: int, "SEED"?: int, "BINS"?: int }
         if path == "/api/simulate" and request.method == "POST":
-            import time
-            request_timings = {}
-            t_request_start = time.perf_counter()
-
-            # 메모리 정리 강제 실행
-            import gc
-            gc.collect()
-
+            # 강제 gc.collect() 없음: 요청당 할당은 결과 dict + SVG 문자열 수준으로 작고,
+            # 분포/인덱스/SVG 템플릿은 상한이 있는 isolate 캐시에 남습니다 (MEMPROFILE로 확인)
             try:
-                from logic.compute import run_simulation
-                from logic.compute_not_used import build_pity_cdf, load_precomputed_from_assets, load_precomputed_from_kv
-            except Exception as e:
-                return Response.json({"ok": False, "error": f"import failed: {e}"}, status=500, headers=CORS)
-
-            try:
-                t0 = time.perf_counter()
-                body = await request.json()
-                request_timings["0_parse_request_ms"] = (time.perf_counter() - t0) * 1000
+                with tracing.span("parse"):
+                    body = await request.json()
             except Exception:
                 return Response.json({"ok": False, "error": "invalid json"}, status=400, headers=CORS)
 
@@ -57,75 +170,179 @@ class Default(WorkerEntrypoint):
                 game_id  = int(body.get("GAME_ID"))
                 goal     = int(body.get("GOAL"))
                 obs_tot  = int(body.get("OBS_TOTAL"))
-
-                # Assets에서 사전 계산된 데이터 로드 (~1-3ms)
-                t1 = time.perf_counter()
-                precomputed_data = await load_precomputed_from_assets(self.env.ASSETS, game_id, goal)
-                request_timings["1_load_assets_ms"] = (time.perf_counter() - t1) * 1000
-
-                # 데이터가 없으면 에러 반환 (실시간 시뮬레이션 비활성화)
-                if not precomputed_data:
-                    return Response.json({
-                        "ok": False,
-                        "error": f"No precomputed data for game_id={game_id}, goal={goal}. Please use goal between 1-20."
-                    }, status=400, headers=CORS)
-
-                # CDF 캐싱 - 게임 ID별 키 사용
-                t2 = time.perf_counter()
-                cdf_key = f"cdf_{game_id}"
-                cdf_str = await store.get(cdf_key)
-
-                if cdf_str:
-                    cdf = json.loads(cdf_str)
-                else:
-                    cdf = build_pity_cdf(game_id)
-                    await store.put(cdf_key, json.dumps(cdf))
-                request_timings["2_cdf_cache_ms"] = (time.perf_counter() - t2) * 1000
-
-                # 시뮬레이션 실행 (compute.py에서 시간 측정)
-                t3 = time.perf_counter()
-                summary, svg, compute_timings = run_simulation(
-                    game_id=game_id,
-                    goal=goal,
-                    obs_total=obs_tot,
-                    precomputed_data=precomputed_data
-                )
-                request_timings["3_run_simulation_total_ms"] = (time.perf_counter() - t3) * 1000
             except Exception as e:
-                import traceback
-                error_details = traceback.format_exc()
-                print(f"[Error #{count}] {error_details}")
                 return Response.json({"ok": False, "error": "01_ "+str(e)}, status=400, headers=CORS)
+
+            payload, status, _ = await self._simulate(request_id, game_id, goal, obs_tot)
+            return Response.json(payload, status=status, headers=CORS)
+
+        # 시뮬레이션 API (캐시 가능한 GET)
+        # GET /api/simulate?game=1&goal=7&obs=888
+        # 응답은 (데이터 버전, game, goal, obs)의 순수 함수이므로 강한 ETag + 장기 Cache-Control,
+        # 같은 쿼리는 colo Cache API에서 Python 계산 없이 반환 (If-None-Match 일치 시 304)
+        if path == "/api/simulate" and request.method == "GET":
+            parsed = urlparse(request.url)
+            params = parse_qs(parsed.query)
+            try:
+                game_id = int(params["game"][0])
+                goal = int(params["goal"][0])
+                obs_tot = int(params["obs"][0])
+            except (KeyError, ValueError):
+                return Response.json({"ok": False, "error": "game, goal, obs must be integers"}, status=400, headers=CORS)
             try:
-                # 데이터 소스 결정
-                if precomputed_data:
-                    data_source = "Assets precomputed"
-                else:
-                    data_source = "live simulation"
+                datasource.validate_key(game_id, goal)
+            except ValueError as e:
+                return Response.json({"ok": False, "error": str(e)}, status=400, headers=CORS)
 
-                print(f"[Request #{count}] game_id={game_id}, goal={goal}, obs_total={obs_tot} ({data_source})")
-                print(f"Summary: {summary.get('percentile_rank_of_obs_%', 'N/A')}")
+            version = await data_version(self.env.ASSETS)
+            etag = edge_cache.strong_etag(SIMULATE_RESPONSE_VERSION, version, game_id, goal, obs_tot)
+            headers = {**CORS, "Cache-Control": SIMULATE_CACHE_CONTROL, "ETag": etag}
+            if edge_cache.etag_matches(request.headers.get("If-None-Match"), etag):
+                return Response("", status=304, headers=headers)
 
-                # 시뮬레이션 후 메모리 정리
-                gc.collect()
+            # 캐시 키: 정규화된 쿼리 (파라미터 순서/표기와 무관) + ETag (데이터/응답 버전 포함)
+            cache_url = (f"{parsed.scheme}://{parsed.netloc}/api/simulate"
+                         f"?game={game_id}&goal={goal}&obs={obs_tot}&v={etag[1:-1]}")
+            with tracing.span("cache"):
+                cached = await edge_cache.match(cache_url)
+            if cached is not None:
+                body, _ = cached
+                return Response(body.decode("utf-8"), headers={**headers, "Content-Type": "application/json"})
 
-                # 전체 요청 처리 시간
-                request_timings["4_total_request_ms"] = (time.perf_counter() - t_request_start) * 1000
+            payload, status, cacheable = await self._simulate(request_id, game_id, goal, obs_tot)
+            if status != 200:
+                return Response.json(payload, status=status, headers=CORS)
+            if not cacheable:
+                # 근사 분포 응답: ETag/엣지 캐시 없이 매번 계산 (다음 요청은 정확한 경로 재시도)
+                return Response.json(payload, headers={**CORS, "Cache-Control": "no-store"})
+            body = json.dumps(payload)
+            self._defer(edge_cache.put(cache_url, body, {
+                "Content-Type": "application/json", "ETag": etag, "Cache-Control": EDGE_CACHE_CONTROL,
+            }))
+            return Response(body, headers={**headers, "Content-Type": "application/json"})
 
-                # compute_timings를 request_timings에 병합
-                all_timings = {**request_timings, **compute_timings}
+        # 배치 시뮬레이션 API
+        # POST /api/simulate/batch
+        # body: { "queries": [{ "GAME_ID": 1, "GOAL": 7, "OBS_TOTAL": 888, "SVG"?: bool }, ...], "SVG"?: bool }
+        # (game_id, goal)별로 분포를 한 번만 로드하고 해당 관측치를 한 번에 평가
+        if path == "/api/simulate/batch" and request.method == "POST":
+            try:
+                body = await request.json()
+                queries = body.get("queries")
+                default_svg = bool(body.get("SVG", False))
+            except Exception:
+                return Response.json({"ok": False, "error": "invalid json"}, status=400, headers=CORS)
+            if not isinstance(queries, list) or not queries:
+                return Response.json({"ok": False, "error": "queries must be a non-empty list"}, status=400, headers=CORS)
+            if len(queries) > BATCH_MAX_QUERIES:
+                return Response.json({"ok": False, "error": f"too many queries (max {BATCH_MAX_QUERIES})"}, status=400, headers=CORS)
 
+            # (game_id, goal)별 그룹화 (잘못된 쿼리는 개별 에러)
+            results = [None] * len(queries)
+            groups = {}
+            for i, query in enumerate(queries):
+                try:
+                    key = (int(query.get("GAME_ID")), int(query.get("GOAL")))
+                    obs_tot = int(query.get("OBS_TOTAL"))
+                    want_svg = bool(query.get("SVG", default_svg))
+                except Exception:
+                    results[i] = {"ok": False, "error": "GAME_ID, GOAL, OBS_TOTAL must be integers"}
+                    continue
+                groups.setdefault(key, []).append((i, obs_tot, want_svg))
+
+            approximate = False
+            for (game_id, goal), items in groups.items():
+                try:
+                    precomputed_data, _, exact = await self._load_distribution(game_id, goal)
+                    if not precomputed_data:
+                        raise ValueError(f"No precomputed data for game_id={game_id}, goal={goal}")
+                    evaluated = evaluate_batch(
+                        game_id, goal,
+                        [obs_tot for _, obs_tot, _ in items],
+                        precomputed_data,
+                        with_svg=[want_svg for _, _, want_svg in items],
+                    )
+                except Exception as e:
+                    for i, _, _ in items:
+                        results[i] = {"ok": False, "error": str(e)}
+                    continue
+                for (i, _, _), (summary, svg) in zip(items, evaluated):
+                    results[i] = {"ok": True, "summary": summary}
+                    if svg is not None:
+                        results[i]["image_svg"] = svg
+                    if not exact:
+                        results[i]["approximate"] = True
+                approximate = approximate or not exact
+
+            print(f"[Request #{request_id}] batch queries={len(queries)}, groups={len(groups)}")
+            # 근사 분포가 섞인 응답은 어떤 캐시에도 남기지 않음 (단일 /api/simulate와 동일)
+            headers = {**CORS, "Cache-Control": "no-store"} if approximate else CORS
+            return Response.json({"ok": True, "results": results}, headers=headers)
+
+        # 분위수 API
+        # GET /api/quantiles?game=1&goal=7&q=0.5,0.9,0.99 (q 반복 지정도 가능, 생략 시 0.5/0.9/0.99)
+        # 누적 빈도 인덱스에서 확률당 이진 탐색 1회 (SVG 없음)
+        if path == "/api/quantiles" and request.method == "GET":
+            params = parse_qs(urlparse(request.url).query)
+            try:
+                game_id = int(params["game"][0])
+                goal = int(params["goal"][0])
+                qs = [float(q) for value in params.get("q", []) for q in value.split(",") if q.strip()]
+            except (KeyError, ValueError):
+                return Response.json({"ok": False, "error": "game and goal must be integers, q must be numbers"}, status=400, headers=CORS)
+            qs = qs or list(QUANTILES_DEFAULT_Q)
+            if len(qs) > QUANTILES_MAX_Q or not all(0.0 < q <= 1.0 for q in qs):
+                return Response.json({"ok": False, "error": f"q must be 1-{QUANTILES_MAX_Q} values in (0, 1]"}, status=400, headers=CORS)
+
+            try:
+                precomputed_data, data_source, exact = await self._load_distribution(game_id, goal)
+                if not precomputed_data:
+                    raise ValueError(f"No precomputed data for game_id={game_id}, goal={goal}")
+                table = quantile_table(game_id, goal, precomputed_data, qs)
+            except Exception as e:
+                return Response.json({"ok": False, "error": str(e)}, status=400, headers=CORS)
+
+            payload = {"ok": True, "game_id": game_id, "goal": goal, "source": data_source, **table}
+            if not exact:
+                payload["approximate"] = True
+            return Response.json(
+                payload,
+                headers={**CORS, "Cache-Control": QUERY_CACHE_CONTROL if exact else "no-store"},
+            )
+
+        # 예산 계획 API
+        # GET /api/plan?game=1&budget=1000&target=0.9 (budget, target 중 하나 이상)
+        # goal 1~20 각각의 예산 내 달성 확률 / 목표 확률에 필요한 뽑기 횟수
+        if path == "/api/plan" and request.method == "GET":
+            params = parse_qs(urlparse(request.url).query)
+            try:
+                game_id = int(params["game"][0])
+                budget = int(params["budget"][0]) if "budget" in params else None
+                target = float(params["target"][0]) if "target" in params else None
+            except (KeyError, ValueError):
+                return Response.json({"ok": False, "error": "game, budget must be integers, target must be a number"}, status=400, headers=CORS)
+            if game_id not in GAME_TABLE:
+                return Response.json({"ok": False, "error": f"Unknown GAME_ID: {game_id}"}, status=400, headers=CORS)
+            if budget is None and target is None:
+                return Response.json({"ok": False, "error": "budget or target is required"}, status=400, headers=CORS)
+            if target is not None and not 0.0 < target <= 1.0:
+                return Response.json({"ok": False, "error": "target must be in (0, 1]"}, status=400, headers=CORS)
+
+            try:
+                # goal별 분포 로드 (isolate 캐시 미스인 goal만 ASSETS fetch, 동시 실행)
+                loaded = await asyncio.gather(*(self._load_distribution(game_id, goal) for goal in PLAN_GOALS))
+                distributions = {}
+                for goal, (precomputed_data, _, _) in zip(PLAN_GOALS, loaded):
+                    if not precomputed_data:
+                        raise ValueError(f"No precomputed data for game_id={game_id}, goal={goal}")
+                    distributions[goal] = precomputed_data
+                plan = plan_budget(game_id, distributions, budget=budget, target=target)
             except Exception as e:
-                import traceback
-                error_details = traceback.format_exc()
-                print(f"[Error #{count}] {error_details}")
-                return Response.json({"ok": False, "error": "02_ "+str(e)}, status=400, headers=CORS)
+                return Response.json({"ok": False, "error": str(e)}, status=400, headers=CORS)
 
-            # 권장: base64 data URL 대신 '생 SVG 문자열'을 그대로 전달
-            # 프런트에서 Blob(URL.createObjectURL)로 <img src>에 붙이세요.
             return Response.json(
-                {"ok": True, "summary": summary, "image_svg": svg, "timings": all_timings},
-                headers=CORS
+                {"ok": True, "game_id": game_id, "budget": budget, "target": target, "goals": plan},
+                headers={**CORS, "Cache-Control": QUERY_CACHE_CONTROL},
             )
 
         # 정적 자산 (assets/) — ASSETS 바인딩 필요 (wrangler.toml)
@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
-from math import sqrt
+from bisect import bisect_left
+from itertools import accumulate
+from math import ceil, sqrt
 from typing import Dict, Tuple, List
 
+from . import tracing
+
 # ---- GAME_ID별 기본 파라미터 ----
 GAME_TABLE = {
     1: dict(CEIL_RATIO=0.5,  MAX_T=80, BASE_P=0.008, ACCEL_START=63, ACCEL_STEP=0.06),
@@ -13,6 +17,136 @@ SEED = 31014646
 BINS = 300
 
 
+# ---------- CDF 구성 ----------
+# 파라미터 튜플 (MAX_T, BASE_P, ACCEL_START, ACCEL_STEP) → {"cdf", "pmf", "alias"}
+# 같은 파라미터를 쓰는 게임은 테이블을 공유하고, GAME_TABLE이 바뀌면 새 키로 다시 계산합니다.
+# 반환되는 리스트는 캐시 객체 그대로이므로 호출자는 수정하지 않습니다.
+_PITY_TABLES: Dict[Tuple, Dict] = {}
+
+
+def pity_params(game_id) -> Tuple:
+    """pity 분포를 결정하는 파라미터 튜플 (캐시 키)
+
+    Raises:
+        ValueError: 알 수 없는 game_id
+    """
+    cfg = GAME_TABLE.get(game_id)
+    if not cfg:
+        raise ValueError(f"Unknown GAME_ID: {game_id}")
+    return (cfg["MAX_T"], cfg["BASE_P"], cfg["ACCEL_START"], cfg["ACCEL_STEP"])
+
+
+def _pity_tables(game_id) -> Dict:
+    """파라미터 튜플별 CDF/PMF 테이블 (최초 1회 계산 후 메모)"""
+    key = pity_params(game_id)
+    tables = _PITY_TABLES.get(key)
+    if tables is None:
+        cdf = _compute_pity_cdf(*key)
+        # 시도수 T의 PMF (index = 시도수, pmf[0] = 0)
+        pmf = [0.0, cdf[0]] + [cdf[i] - cdf[i-1] for i in range(1, len(cdf))]
+        tables = {"cdf": cdf, "pmf": pmf, "alias": None}
+        _PITY_TABLES[key] = tables
+    return tables
+
+
+def _compute_pity_cdf(max_t: int, base_p: float, accel_start: int, accel_step: float) -> List[float]:
+    """최초 성공까지 걸리는 시도수 T(1..max_t)의 CDF 계산"""
+    # p[t-1] = 각 시도에서의 성공 확률
+    p = [0.0] * max_t
+    for t in range(1, max_t + 1):
+        if t <= accel_start:
+            p[t-1] = base_p
+        else:
+            inc = base_p + accel_step * (t - accel_start)
+            p[t-1] = inc if inc < 1.0 else 1.0
+
+    pmf = [0.0] * max_t
+    survival = 1.0
+    for i in range(max_t):
+        pmf[i] = survival * p[i]
+        survival *= (1.0 - p[i])
+
+    cdf = [0.0] * max_t
+    s = 0.0
+    for i in range(max_t):
+        s += pmf[i]
+        cdf[i] = s
+
+    # 꼬리 보정
+    tail = 1.0 - cdf[-1]
+    if tail > 0:
+        pmf[-1] += tail
+        s = 0.0
+        for i in range(max_t):
+            s += pmf[i]
+            cdf[i] = s
+    return cdf
+
+
+def build_pity_cdf(game_id) -> List[float]:
+    """최초 성공까지 걸리는 시도수 T(1..max_t)의 CDF (list[float], 파라미터별 메모)"""
+    return _pity_tables(game_id)["cdf"]
+
+
+def pity_pmf(game_id) -> List[float]:
+    """시도수 T의 PMF (index = 시도수, pmf[0] = 0, 파라미터별 메모)"""
+    return _pity_tables(game_id)["pmf"]
+
+
+def pity_alias(game_id) -> Tuple[List[float], List[int]]:
+    """시도수 T 샘플링용 Alias 테이블 (prob, alias) (최초 요청 시 생성 후 메모)"""
+    tables = _pity_tables(game_id)
+    if tables["alias"] is None:
+        tables["alias"] = _build_alias_from_cdf(tables["cdf"])
+    return tables["alias"]
+
+
+def _build_alias_from_cdf(cdf: List[float]) -> Tuple[List[float], List[int]]:
+    """Walker's Alias Method를 위한 전처리 테이블 생성
+
+    CDF에서 PMF를 추출하고 O(1) 샘플링을 위한 alias 테이블 구성
+
+    Args:
+        cdf: 누적분포함수 (정규화되지 않아도 됨)
+
+    Returns:
+        (prob, alias): Alias Method용 확률 테이블과 별칭 테이블
+    """
+    # 리스트 컴프리헨션으로 PMF 추출 (최적화)
+    M = len(cdf)
+    pmf = [cdf[0]] + [cdf[i] - cdf[i-1] for i in range(1, M)]
+    s = sum(pmf)
+    if s <= 0:
+        raise ValueError("Invalid CDF: sum must be positive")
+
+    # 정규화 및 스케일링을 한 번에 처리
+    scaled = [p * M / s for p in pmf]
+
+    # 초기 분류
+    small = [i for i, v in enumerate(scaled) if v < 1.0]
+    large = [i for i, v in enumerate(scaled) if v >= 1.0]
+
+    prob = [0.0] * M
+    alias = [0] * M
+
+    while small and large:
+        s_i = small.pop()
+        l_i = large.pop()
+        prob[s_i] = scaled[s_i]
+        alias[s_i] = l_i
+        scaled[l_i] = scaled[l_i] + scaled[s_i] - 1.0
+        (small if scaled[l_i] < 1.0 else large).append(l_i)
+
+    for i in large + small:
+        prob[i] = 1.0
+    return prob, alias
+
+
+# GAME_TABLE 기반 pity 테이블(CDF/PMF)은 import 시 1회 계산 (메모리 스냅샷에 포함, exact.episode_pmf 등이 재사용)
+for _game_id in GAME_TABLE:
+    _pity_tables(_game_id)
+
+
 # ---------- 데이터 압축/해제 (빈도 리스트) ----------
 def decompress_totals(min_val: int, freq: List[int]) -> List[int]:
     """빈도 리스트에서 원본 totals 완벽 복원
@@ -32,6 +166,37 @@ def decompress_totals(min_val: int, freq: List[int]) -> List[int]:
     return totals
 
 
+def split_precomputed(precomputed_data) -> Tuple[int, List[int]]:
+    """사전 계산 데이터를 (min_val, freq) 형태로 정규화
+
+    지원 형식:
+        - [min_val, freq]: 원본 압축 형식 (precomputed_game{N}.json)
+        - freq: 0부터 시작하는 빈도 리스트 (precomputed_game{N}_v2.json)
+
+    Args:
+        precomputed_data: 사전 계산된 데이터 (두 형식 중 하나)
+
+    Returns:
+        (min_val, freq): v2 형식은 앞쪽 0 구간을 잘라 실제 최소값을 복원
+    """
+    if len(precomputed_data) == 2 and isinstance(precomputed_data[1], list):
+        min_val, freq = precomputed_data
+        return int(min_val), freq
+
+    freq = precomputed_data
+    start = 0
+    while start < len(freq) and freq[start] == 0:
+        start += 1
+    return start, freq[start:]
+
+
+# SVG 레이아웃 (폭/높이, 좌/우/상/하 여백)
+SVG_W, SVG_H = 800, 450
+SVG_L, SVG_R, SVG_T, SVG_B = 60, 20, 30, 50
+
+EMPTY_SVG = '<svg xmlns="http://www.w3.org/2000/svg" width="800" height="450"></svg>'
+
+
 def make_hist_svg(totals, obs_total, bins=128, title=""):
     """히스토그램 SVG 생성 (정규분포 제거)
 
@@ -45,7 +210,7 @@ def make_hist_svg(totals, obs_total, bins=128, title=""):
         svg_string
     """
     if not totals:
-        return '<svg xmlns="http://www.w3.org/2000/svg" width="800" height="450"></svg>'
+        return EMPTY_SVG
 
     # 히스토그램(density)
     x_min, x_max = min(totals), max(totals)
@@ -53,41 +218,167 @@ def make_hist_svg(totals, obs_total, bins=128, title=""):
         x_min -= 0.5; x_max += 0.5
     bins = max(32, min(int(bins), 256))
     width = (x_max - x_min) / float(bins)
-    edges = [x_min + i * width for i in range(bins + 1)]
     counts = [0] * bins
     for v in totals:
         i = int((v - x_min) / width)
         if i == bins: i -= 1
         counts[i] += 1
-    n = len(totals)
+    template = _build_hist_template(x_min, x_max, counts, len(totals), title)
+    return render_hist_svg(template, obs_total)
+
+
+def make_hist_svg_freq(min_val: int, freq: List[int], obs_total, bins=128, title=""):
+    """빈도 리스트에서 직접 히스토그램 SVG 생성 (압축 해제 없음)
+
+    freq의 각 값을 make_hist_svg와 같은 식으로 구간에 배정해 빈도를 더하므로
+    decompress_totals 결과로 그린 SVG와 완전히 동일한 문자열을 반환합니다.
+    비용: O(len(freq) + bins)
+
+    Args:
+        min_val: 최소값
+        freq: 빈도 리스트
+        obs_total: 관측된 값 (빨간 수직선 표시)
+        bins: 히스토그램 구간 수
+        title: 차트 제목
+
+    Returns:
+        svg_string
+    """
+    return render_hist_svg(make_hist_template(min_val, freq, bins=bins, title=title), obs_total)
+
+
+def make_hist_svg_cached(index: Dict, obs_total, bins=128, title=""):
+    """누적 빈도 인덱스에 캐시된 SVG 기본 레이어에 관측치 수직선만 삽입
+
+    축/눈금/제목/히스토그램 path는 (game, goal, bins)마다 한 번만 만들고,
+    요청마다 <line> 요소 하나만 포맷합니다. 결과는 make_hist_svg_freq와 동일합니다.
+
+    Args:
+        index: get_freq_index 결과 (템플릿 캐시 보관 위치)
+        obs_total: 관측된 값 (빨간 수직선 표시)
+        bins: 히스토그램 구간 수
+        title: 차트 제목
+
+    Returns:
+        svg_string
+    """
+    templates = index.setdefault("svg_templates", {})
+    key = (int(bins), title)
+    template = templates.get(key)
+    if template is None:
+        if len(templates) >= SVG_TEMPLATE_CACHE_MAX:
+            del templates[next(iter(templates))]
+        template = make_hist_template(index["min_val"], index["freq"], bins=bins, title=title)
+        templates[key] = template
+    return render_hist_svg(template, obs_total)
+
+
+def make_hist_template(min_val: int, freq: List[int], bins=128, title=""):
+    """빈도 리스트로 관측치 수직선을 뺀 SVG 기본 레이어 생성 (O(len(freq) + bins))
+
+    Args:
+        min_val: 최소값
+        freq: 빈도 리스트
+        bins: 히스토그램 구간 수
+        title: 차트 제목
+
+    Returns:
+        (head, tail, x_min, x_max) 템플릿 또는 데이터가 없으면 None
+    """
+    rebinned = rebin_freq(min_val, freq, bins)
+    if rebinned is None:
+        return None
+    return _build_hist_template(*rebinned, title)
+
+
+def rebin_freq(min_val: int, freq: List[int], bins=128):
+    """빈도 리스트를 히스토그램 구간으로 재배정 (make_hist_svg와 같은 구간 배정)
+
+    Args:
+        min_val: 최소값
+        freq: 빈도 리스트
+        bins: 히스토그램 구간 수 (32~256으로 제한)
+
+    Returns:
+        (x_min, x_max, counts, n) 또는 데이터가 없으면 None
+    """
+    # 실제 데이터 범위 (양 끝의 0 빈도 제외)
+    first, last = 0, len(freq) - 1
+    while first <= last and freq[first] == 0:
+        first += 1
+    while last >= first and freq[last] == 0:
+        last -= 1
+    if first > last:
+        return None
+
+    # 히스토그램(density) - 구간 재배정 (rebinning)
+    x_min, x_max = min_val + first, min_val + last
+    if x_max == x_min:
+        x_min -= 0.5; x_max += 0.5
+    bins = max(32, min(int(bins), 256))
+    width = (x_max - x_min) / float(bins)
+    counts = [0] * bins
+    n = 0
+    for j in range(first, last + 1):
+        count = freq[j]
+        if count:
+            i = int((min_val + j - x_min) / width)
+            if i == bins: i -= 1
+            counts[i] += count
+            n += count
+    return x_min, x_max, counts, n
+
+
+def render_hist_svg(template, obs_total) -> str:
+    """SVG 기본 레이어 템플릿에 관측치 수직선을 삽입해 완성
+
+    Args:
+        template: make_hist_template 결과 (None이면 빈 SVG)
+        obs_total: 관측된 값 (빨간 수직선 표시)
+
+    Returns:
+        svg_string
+    """
+    if template is None:
+        return EMPTY_SVG
+    head, tail, x_min, x_max = template
+    return head + _obs_line(x_min, x_max, obs_total) + tail
+
+
+def _obs_line(x_min, x_max, obs_total) -> str:
+    """관측치 빨간 점선 <line> 요소"""
+    L, T = SVG_L, SVG_T
+    innerW, innerH = SVG_W - SVG_L - SVG_R, SVG_H - SVG_T - SVG_B
+    ox = L + (min(max(obs_total, x_min), x_max) - x_min) * (innerW / max(1e-9, (x_max - x_min)))
+    return f'<line x1="{ox:.2f}" y1="{T}" x2="{ox:.2f}" y2="{T+innerH}" stroke="#c62828" stroke-dasharray="6 4" stroke-width="2"/>'
+
+
+def _build_hist_template(x_min, x_max, counts: List[int], n: int, title=""):
+    """구간별 빈도로 관측치 수직선 앞/뒤로 나뉜 SVG 템플릿 생성
+
+    Args:
+        x_min: x축 최소값
+        x_max: x축 최대값
+        counts: 구간별 빈도 (len(counts) = bins)
+        n: 전체 샘플 수
+        title: 차트 제목
+
+    Returns:
+        (head, tail, x_min, x_max): head + obs_line + tail = 완성된 SVG
+    """
+    bins = len(counts)
+    width = (x_max - x_min) / float(bins)
     density = [c / (n * width) for c in counts]
 
     # SVG 좌표
-    W, H = 800, 450
-    L, R, T, B = 60, 20, 30, 50
+    W, H = SVG_W, SVG_H
+    L, R, T, B = SVG_L, SVG_R, SVG_T, SVG_B
     innerW, innerH = W - L - R, H - T - B
 
-    # y 스케일
-    y_max = max(density) if density else 1.0
-
     def sx(x): return L + (x - x_min) * (innerW / max(1e-9, (x_max - x_min)))
-    def sy(y): return T + innerH - y * (innerH / y_max)
 
-    # 히스토그램 path
-    y0 = 0.0
-    threshold = y_max * 1e-5
-    path_parts = [f"M {sx(edges[0]):.2f} {sy(0.0):.2f}"]
-    for i, d in enumerate(density):
-        x1 = edges[i+1]
-        d_val = 0.0 if d < threshold else d
-        path_parts.extend([f"L {sx(x1):.2f} {sy(y0):.2f}", f"L {sx(x1):.2f} {sy(d_val):.2f}"])
-        y0 = d_val
-    path_parts.append(f"L {sx(edges[-1]):.2f} {sy(0):.2f} Z")
-    area_path = " ".join(path_parts)
-
-    # 관측치 수직선
-    ox = sx(min(max(obs_total, x_min), x_max))
-    obs_line = f'<line x1="{ox:.2f}" y1="{T}" x2="{ox:.2f}" y2="{T+innerH}" stroke="#c62828" stroke-dasharray="6 4" stroke-width="2"/>'
+    # 히스토그램 path (픽셀 격자 좌표 + 상대 h/v 명령, 같은 높이 구간 병합)
+    area_path = _hist_path(density)
 
     # 축/레이블
     mid_w, mid_h = L + innerW / 2, T + innerH / 2
@@ -112,14 +403,61 @@ def make_hist_svg(totals, obs_total, bins=128, title=""):
             f'<text x="{tx:.2f}" y="{tick_y2+16}" text-anchor="middle" font-size="11">{int(round(vx))}</text>'
         ])
 
-    svg = f'''<svg xmlns="http://www.w3.org/2000/svg" width="{W}" height="{H}">
+    # 관측치 수직선 자리를 기준으로 앞/뒤 분리
+    head = f'''<svg xmlns="http://www.w3.org/2000/svg" width="{W}" height="{H}">
   <rect x="0" y="0" width="{W}" height="{H}" fill="white"/>
   {''.join(axes)}
   <path d="{area_path}" fill="black" opacity="0.14" stroke="none"/>
-  {obs_line}
+  '''
+    tail = f'''
   {''.join(ticks)}
 </svg>'''
-    return svg
+    return head, tail, x_min, x_max
+
+
+def _hist_path(density: List[float]) -> str:
+    """히스토그램 영역 path (정수 픽셀 좌표, 상대 h/v 명령)
+
+    구간 경계 x와 높이 y를 픽셀 격자로 반올림하고, 높이가 같은 연속 구간은 h 하나로 합칩니다.
+    양 끝의 높이 0 구간은 생략합니다 (면적 0). 모양은 이전 절대좌표 L 경로와 같습니다:
+    구간 [edge_i, edge_i+1]의 높이는 직전 bin의 밀도이고 첫 구간은 0입니다.
+
+    Args:
+        density: 구간별 밀도 (len = bins)
+
+    Returns:
+        path d 문자열 (예: "M63 400v-12h3v-5h6V400Z")
+    """
+    bins = len(density)
+    innerW, innerH = SVG_W - SVG_L - SVG_R, SVG_H - SVG_T - SVG_B
+    bottom = SVG_T + innerH
+    y_max = max(density) if density else 1.0
+    threshold = y_max * 1e-5
+    scale = innerH / y_max
+
+    xs = [round(SVG_L + i * innerW / bins) for i in range(bins + 1)]
+    ys = [bottom] + [bottom - round(d * scale) if d >= threshold else bottom for d in density[:-1]]
+
+    first = next((i for i, y in enumerate(ys) if y != bottom), None)
+    if first is None:
+        return ""
+    last = max(i for i, y in enumerate(ys) if y != bottom)
+
+    parts = [f"M{xs[first]} {bottom}"]
+    cur_y = bottom
+    i = first
+    while i <= last:
+        y = ys[i]
+        j = i
+        while j < last and ys[j + 1] == y:
+            j += 1
+        if y != cur_y:
+            parts.append(f"v{y - cur_y}")
+            cur_y = y
+        parts.append(f"h{xs[j + 1] - xs[i]}")
+        i = j + 1
+    parts.append(f"V{bottom}Z")
+    return "".join(parts)
 
 
 # ---------- 요약 ----------
@@ -171,6 +509,175 @@ def summarize(totals: List[int], obs_total: int, n_sims: int) -> Dict:
     }
 
 
+# ---------- 누적 빈도 인덱스 ----------
+FREQ_INDEX_CACHE_MAX = 128  # isolate에 보관할 최대 (game_id, goal) 인덱스 수
+SVG_TEMPLATE_CACHE_MAX = 4  # 인덱스당 보관할 최대 SVG 템플릿 수 ((bins, title)별)
+
+# (game_id, goal) → build_freq_index 결과 (isolate 단위 메모)
+_FREQ_INDEX_CACHE: Dict[Tuple[int, int], Dict] = {}
+
+
+def build_freq_index(min_val: int, freq: List[int]) -> Dict:
+    """빈도 리스트의 누적 빈도 인덱스 생성 (O(len(freq)), goal당 1회)
+
+    cum[i] = (min_val + i 이하인 샘플 수) 이므로
+    percentile은 조회 1회, 분위수는 이진 탐색 1회로 계산됩니다.
+    평균/표본 표준편차는 정수 누적합으로 함께 계산해 둡니다.
+
+    Args:
+        min_val: 최소값
+        freq: 빈도 리스트
+
+    Returns:
+        {"min_val", "freq", "cum", "n", "mean", "std"} 딕셔너리
+    """
+    cum = list(accumulate(freq))
+    n = cum[-1] if cum else 0
+
+    # 정수 누적합: Σv·c, Σv²·c (오차 없는 계산)
+    total_sum = 0
+    square_sum = 0
+    for i, count in enumerate(freq):
+        if count:
+            value = min_val + i
+            weighted = value * count
+            total_sum += weighted
+            square_sum += weighted * value
+
+    if n == 0:
+        mean = std = float("nan")
+    else:
+        mean = total_sum / n
+        # 표본 분산 = (n·Σv² - (Σv)²) / (n·(n-1))
+        std = sqrt((n * square_sum - total_sum * total_sum) / (n * (n - 1))) if n > 1 else 0.0
+
+    return {"min_val": min_val, "freq": freq, "cum": cum, "n": n, "mean": mean, "std": std}
+
+
+def get_freq_index(game_id: int, goal: int, min_val: int, freq: List[int]) -> Dict:
+    """(game_id, goal)별 누적 빈도 인덱스 조회 (없거나 데이터가 바뀌었으면 생성)
+
+    Args:
+        game_id: 게임 ID
+        goal: 목표 획득 수
+        min_val: 최소값
+        freq: 빈도 리스트
+
+    Returns:
+        build_freq_index 결과 딕셔너리
+    """
+    key = (game_id, goal)
+    index = _FREQ_INDEX_CACHE.get(key)
+    if index is None or index["freq"] is not freq or index["min_val"] != min_val:
+        if key not in _FREQ_INDEX_CACHE and len(_FREQ_INDEX_CACHE) >= FREQ_INDEX_CACHE_MAX:
+            del _FREQ_INDEX_CACHE[next(iter(_FREQ_INDEX_CACHE))]
+        index = build_freq_index(min_val, freq)
+        _FREQ_INDEX_CACHE[key] = index
+    return index
+
+
+def count_at_most(index: Dict, value: int) -> int:
+    """value 이하인 샘플 수 (O(1))"""
+    i = value - index["min_val"]
+    if i < 0:
+        return 0
+    cum = index["cum"]
+    if i >= len(cum):
+        return index["n"]
+    return cum[i]
+
+
+def percentile_rank(index: Dict, obs_total: int) -> float:
+    """obs_total보다 큰 샘플의 비율(%) (O(1))"""
+    n = index["n"]
+    if n == 0:
+        return float("nan")
+    return ((n - count_at_most(index, obs_total)) / n) * 100.0
+
+
+def quantile(index: Dict, q: float) -> int:
+    """P(X <= v) >= q 를 만족하는 최소 v (O(log len(freq)))
+
+    Args:
+        index: build_freq_index 결과
+        q: 0~1 사이 확률 (예: 0.5 → 중앙값, 0.99 → p99)
+
+    Returns:
+        분위수 값 (총 뽑기 횟수)
+    """
+    if not 0.0 <= q <= 1.0:
+        raise ValueError(f"quantile q must be in [0, 1]: {q}")
+    n = index["n"]
+    if n == 0:
+        raise ValueError("quantile of empty distribution")
+    # 부동소수 오차로 목표 개수가 1 늘어나는 것 방지 (예: 0.29 * 1e6)
+    target = max(1, ceil(q * n - 1e-9))
+    return index["min_val"] + bisect_left(index["cum"], target)
+
+
+def summarize_freq(min_val: int, freq: List[int], obs_total: int, n_sims: int = None,
+                   index: Dict = None) -> Dict:
+    """빈도 리스트에서 직접 통계 요약 (압축 해제 없음)
+
+    summarize()와 동일한 딕셔너리를 반환합니다. 누적 빈도 인덱스가 주어지면
+    평균/표준편차는 재사용하고 percentile은 조회 1회로 계산합니다 (N_SIMS 무관).
+
+    Args:
+        min_val: 최소값
+        freq: 빈도 리스트
+        obs_total: 관측된 총 뽑기 횟수
+        n_sims: 시뮬레이션 횟수 (None이면 sum(freq))
+        index: 누적 빈도 인덱스 (None이면 생성, O(len(freq)))
+
+    Returns:
+        통계 요약 딕셔너리
+    """
+    if index is None:
+        index = build_freq_index(min_val, freq)
+    if n_sims is None:
+        n_sims = index["n"]
+
+    return {
+        "samples": int(n_sims),
+        "obs_total_draws": int(obs_total),
+        "mean_total_draws": float(index["mean"]),
+        "std_total_draws": float(index["std"]),
+        "percentile_rank_of_obs_%": float(percentile_rank(index, obs_total)),
+    }
+
+
+def summarize_many(index: Dict, obs_totals: List[int], n_sims: int = None) -> List[Dict]:
+    """한 분포에 대해 여러 관측치의 통계 요약 (평균/표준편차 공유, percentile은 관측치당 O(1))
+
+    Args:
+        index: get_freq_index 결과
+        obs_totals: 관측된 총 뽑기 횟수 목록
+        n_sims: 시뮬레이션 횟수 (None이면 index["n"])
+
+    Returns:
+        obs_totals 순서의 통계 요약 딕셔너리 목록 (summarize_freq와 같은 형식)
+    """
+    n = index["n"]
+    if n_sims is None:
+        n_sims = n
+    min_val, cum = index["min_val"], index["cum"]
+    size = len(cum)
+    mean, std = float(index["mean"]), float(index["std"])
+
+    summaries = []
+    for obs_total in obs_totals:
+        i = obs_total - min_val
+        at_most = 0 if i < 0 else (n if i >= size else cum[i])
+        summaries.append({
+            "samples": int(n_sims),
+            "obs_total_draws": int(obs_total),
+            "mean_total_draws": mean,
+            "std_total_draws": std,
+            "percentile_rank_of_obs_%": ((n - at_most) / n) * 100.0 if n else float("nan"),
+        })
+    return summaries
+
+
 # ---------- 파이프라인 ----------
 def run_simulation(
     game_id: int,
@@ -182,7 +689,7 @@ def run_simulation(
     # cdf: dict = {},
     # kv_store = None,  # Cloudflare KV 스토어 (선택적)
     precomputed_data = None  # 사전 계산된 데이터 (선택적)
-) -> Tuple[Dict, str, Dict]:
+) -> Tuple[Dict, str]:
     """시뮬레이션 실행 및 통계 분석
 
     Args:
@@ -194,36 +701,29 @@ def run_simulation(
         bins: 히스토그램 bins (실제로는 내부에서 재계산됨)
         cdf: 사전 계산된 CDF (선택적)
         kv_store: Cloudflare KV 스토어 객체 (선택적)
-        precomputed_data: 사전 계산된 압축 데이터 [min_val, freq] (선택적)
+        precomputed_data: 사전 계산된 압축 데이터 [min_val, freq] 또는 v2 freq (선택적)
 
     Returns:
-        (summary_dict, svg_string, timing_dict): 통계 요약, SVG 히스토그램, 타이밍 정보
+        (summary_dict, svg_string): 통계 요약, SVG 히스토그램
+        (단계별 시간은 tracing span "validate" / "summarize" / "svg"로 기록)
 
     Raises:
         ValueError: 잘못된 입력값
     """
-    import time
-    timings = {}
-    t_start = time.perf_counter()
-
-    # 입력 검증
-    t0 = time.perf_counter()
-    cfg = GAME_TABLE.get(int(game_id))
-    if not cfg:
-        raise ValueError(f"Unknown GAME_ID: {game_id}")
+    # 입력 검증 + 빈도 리스트 정규화 (통계는 압축 해제 없이 계산)
+    with tracing.span("validate"):
+        cfg = GAME_TABLE.get(int(game_id))
+        if not cfg:
+            raise ValueError(f"Unknown GAME_ID: {game_id}")
 
-    # 사전 계산된 데이터 필수
-    if not precomputed_data:
-        raise ValueError(f"No precomputed data available for game_id={game_id}, goal={goal}")
-    timings["1_validation_ms"] = (time.perf_counter() - t0) * 1000
+        # 사전 계산된 데이터 필수
+        if not precomputed_data:
+            raise ValueError(f"No precomputed data available for game_id={game_id}, goal={goal}")
 
-    # 데이터 압축 해제
-    t1 = time.perf_counter()
-    print(f"Using precomputed data for game_id={game_id}, goal={goal}")
-    min_val, freq = precomputed_data
-    totals = decompress_totals(min_val, freq)
-    n_sims = len(totals)
-    timings["2_decompress_ms"] = (time.perf_counter() - t1) * 1000
+        print(f"Using precomputed data for game_id={game_id}, goal={goal}")
+        min_val, freq = split_precomputed(precomputed_data)
+        index = get_freq_index(game_id, goal, min_val, freq)
+        n_sims = index["n"]
 
     # 실시간 시뮬레이션 비활성화 (코드 보존용)
     # if False:  # 실시간 시뮬레이션 (현재 비활성화)
@@ -242,23 +742,132 @@ def run_simulation(
     #     )
 
     # bins 계산: goal에 비례한 히스토그램 해상도 설정
-    # 공식: goal * 160 / 3 (goal이 클수록 더 세밀한 bins)
-    bins = (goal * 155) // 3
+    bins = hist_bins(goal)
+
+    # 통계 요약 (누적 빈도 인덱스 조회, N_SIMS 무관)
+    with tracing.span("summarize"):
+        summary = summarize_freq(min_val, freq, obs_total, n_sims, index=index)
+
+    # SVG 생성 (캐시된 기본 레이어 + 관측치 수직선)
+    with tracing.span("svg"):
+        svg = make_hist_svg_cached(index, obs_total, bins=bins, title=hist_title(goal, n_sims))
+
+    return summary, svg
+
+
+def hist_bins(goal: int) -> int:
+    """히스토그램 bins: goal * 155 / 3 (goal이 클수록 더 세밀한 bins, SVG에서 32~256으로 제한)"""
+    return (goal * 155) // 3
+
+
+def hist_title(goal: int, n_sims: int) -> str:
+    """히스토그램 제목"""
+    return f"Total draws distribution: GET {goal} (n={n_sims})"
+
+
+def evaluate_batch(game_id: int, goal: int, obs_totals: List[int], precomputed_data,
+                   with_svg: List[bool] = None) -> List[Tuple[Dict, str]]:
+    """같은 (game_id, goal)의 여러 관측치를 한 번에 평가 (분포 정규화/인덱스 조회 1회)
+
+    Args:
+        game_id: 게임 ID (1 또는 2)
+        goal: 목표 획득 수
+        obs_totals: 관측된 총 뽑기 횟수 목록
+        precomputed_data: 사전 계산된 압축 데이터 [min_val, freq] 또는 v2 freq
+        with_svg: 관측치별 SVG 생성 여부 (None이면 모두 생략)
+
+    Returns:
+        obs_totals 순서의 (summary_dict, svg_string 또는 None) 목록
+
+    Raises:
+        ValueError: 잘못된 입력값
+    """
+    index = distribution_index(game_id, goal, precomputed_data)
+    summaries = summarize_many(index, obs_totals)
+
+    if not with_svg:
+        return [(summary, None) for summary in summaries]
+    bins, title = hist_bins(goal), hist_title(goal, index["n"])
+    return [
+        (summary, make_hist_svg_cached(index, obs_total, bins=bins, title=title) if svg else None)
+        for summary, obs_total, svg in zip(summaries, obs_totals, with_svg)
+    ]
+
+
+def distribution_index(game_id: int, goal: int, precomputed_data) -> Dict:
+    """입력 검증 후 (game_id, goal) 분포의 누적 빈도 인덱스 조회
+
+    Args:
+        game_id: 게임 ID (1 또는 2)
+        goal: 목표 획득 수
+        precomputed_data: 사전 계산된 압축 데이터 [min_val, freq] 또는 v2 freq
+
+    Returns:
+        get_freq_index 결과 딕셔너리
+
+    Raises:
+        ValueError: 잘못된 입력값
+    """
+    if not GAME_TABLE.get(int(game_id)):
+        raise ValueError(f"Unknown GAME_ID: {game_id}")
+    if not precomputed_data:
+        raise ValueError(f"No precomputed data available for game_id={game_id}, goal={goal}")
+
+    min_val, freq = split_precomputed(precomputed_data)
+    return get_freq_index(game_id, goal, min_val, freq)
 
-    # 통계 요약
-    t2 = time.perf_counter()
-    summary = summarize(totals, obs_total, n_sims)
-    timings["3_summarize_ms"] = (time.perf_counter() - t2) * 1000
 
-    # SVG 생성
-    t3 = time.perf_counter()
-    title = f"Total draws distribution: GET {goal} (n={n_sims})"
-    svg = make_hist_svg(totals, obs_total, bins=bins, title=title)
-    timings["4_svg_generation_ms"] = (time.perf_counter() - t3) * 1000
+def quantile_table(game_id: int, goal: int, precomputed_data, qs: List[float]) -> Dict:
+    """요청된 확률별 필요 뽑기 횟수 (분위수, 확률당 이진 탐색 1회)
 
-    # 명시적으로 totals 참조 해제 (메모리 절약)
-    del totals
+    Args:
+        game_id: 게임 ID (1 또는 2)
+        goal: 목표 획득 수
+        precomputed_data: 사전 계산된 압축 데이터 [min_val, freq] 또는 v2 freq
+        qs: 0~1 사이 확률 목록 (예: [0.5, 0.9, 0.99])
 
-    timings["5_total_compute_ms"] = (time.perf_counter() - t_start) * 1000
+    Returns:
+        {"samples", "mean_total_draws", "quantiles": [{"q", "draws"}, ...]} (qs 순서)
 
-    return summary, svg, timings
+    Raises:
+        ValueError: 잘못된 입력값
+    """
+    index = distribution_index(game_id, goal, precomputed_data)
+    return {
+        "samples": index["n"],
+        "mean_total_draws": float(index["mean"]),
+        "quantiles": [{"q": q, "draws": quantile(index, q)} for q in qs],
+    }
+
+
+PLAN_GOALS = range(1, 21)  # 예산 계획 대상 goal (사전 계산 에셋 범위)
+
+
+def plan_budget(game_id: int, distributions: Dict[int, object], budget: int = None,
+                target: float = None) -> List[Dict]:
+    """goal별 예산 내 달성 확률 / 목표 확률에 필요한 뽑기 횟수
+
+    누적 빈도 인덱스에서 예산 → 확률은 O(1) 조회, 목표 확률 → 뽑기 횟수는 goal당 이진 탐색 1회입니다.
+
+    Args:
+        game_id: 게임 ID (1 또는 2)
+        distributions: goal → 사전 계산된 압축 데이터 [min_val, freq] 또는 v2 freq
+        budget: 뽑기 예산 (None이면 생략)
+        target: 목표 달성 확률 0~1 (None이면 생략)
+
+    Returns:
+        goal 오름차순 [{"goal", "p_within_budget"?, "draws_for_target"?}, ...]
+
+    Raises:
+        ValueError: 잘못된 입력값
+    """
+    plan = []
+    for goal in sorted(distributions):
+        index = distribution_index(game_id, goal, distributions[goal])
+        row = {"goal": goal}
+        if budget is not None:
+            row["p_within_budget"] = count_at_most(index, budget) / index["n"]
+        if target is not None:
+            row["draws_for_target"] = quantile(index, target)
+        plan.append(row)
+    return plan
@@ -5,11 +5,31 @@ run_simulation 메인 함수에서 사용하지 않는 함수들
 이 파일은 시뮬레이션 생성, 데이터 압축/저장 등의 유틸리티 함수를 포함합니다.
 """
 import random
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 from bisect import bisect_left
 
 # GAME_TABLE import (필요시)
-from .compute import GAME_TABLE, N_SIMS, SEED
+from .compute import (  # noqa: F401 (build_pity_cdf 재노출)
+    GAME_TABLE, N_SIMS, SEED, SVG_B, SVG_H, SVG_L, SVG_R, SVG_T, SVG_W, _build_alias_from_cdf, build_pity_cdf,
+    pity_alias,
+)
+# 서빙 경로 로더 (기존 import 경로 호환용 재노출)
+from .loader import (  # noqa: F401
+    ASSET_VERSION,
+    COMPRESSED_FETCH_MIN_BYTES,
+    MANIFEST_NAME,
+    _compressed_variants,
+    brotli,
+    decompress_variant,
+    invalidate_precomputed_cache,
+    load_precomputed_from_assets,
+    load_precomputed_from_kv,
+)
+
+try:
+    import numpy as np
+except ImportError:  # Pyodide 등 NumPy가 없는 환경 (배치 샘플러만 사용 불가)
+    np = None
 
 
 # ---------- 데이터 압축 ----------
@@ -17,7 +37,7 @@ def compress_totals(totals: List[int]) -> Tuple[int, List[int]]:
     """totals 리스트를 빈도 리스트로 압축 (무손실)
 
     Args:
-        totals: 시뮬레이션 데이터 리스트 (100,000개)
+        totals: 시뮬레이션 데이터 리스트 (100,000개) 또는 NumPy 정수 배열
 
     Returns:
         (min_value, freq_list):
@@ -25,6 +45,13 @@ def compress_totals(totals: List[int]) -> Tuple[int, List[int]]:
         - freq_list: 각 값의 빈도 [count_at_min, count_at_min+1, ...]
         예: goal=30 → 최대 30*160=4800개 원소
     """
+    # NumPy 배열 (sample_total_draws_batched 결과)은 bincount로 압축
+    if np is not None and isinstance(totals, np.ndarray):
+        if totals.size == 0:
+            return 0, []
+        min_val = int(totals.min())
+        return min_val, np.bincount(totals - min_val).tolist()
+
     if not totals:
         return 0, []
 
@@ -40,89 +67,37 @@ def compress_totals(totals: List[int]) -> Tuple[int, List[int]]:
     return min_val, freq
 
 
-# ---------- CDF 구성 ----------
-def build_pity_cdf(game_id) -> List[float]:
-    """최초 성공까지 걸리는 시도수 T(1..max_t)의 CDF (list[float])"""
-    cfg = GAME_TABLE.get(game_id)
-    max_t = cfg["MAX_T"]
-    base_p = cfg["BASE_P"]
-    accel_start = cfg["ACCEL_START"]
-    accel_step = cfg["ACCEL_STEP"]
-
-    # p[t-1] = 각 시도에서의 성공 확률
-    p = [0.0] * max_t
-    for t in range(1, max_t + 1):
-        if t <= accel_start:
-            p[t-1] = base_p
-        else:
-            inc = base_p + accel_step * (t - accel_start)
-            p[t-1] = inc if inc < 1.0 else 1.0
-
-    pmf = [0.0] * max_t
-    survival = 1.0
-    for i in range(max_t):
-        pmf[i] = survival * p[i]
-        survival *= (1.0 - p[i])
-
-    cdf = [0.0] * max_t
-    s = 0.0
-    for i in range(max_t):
-        s += pmf[i]
-        cdf[i] = s
-
-    # 꼬리 보정
-    tail = 1.0 - cdf[-1]
-    if tail > 0:
-        pmf[-1] += tail
-        s = 0.0
-        for i in range(max_t):
-            s += pmf[i]
-            cdf[i] = s
-    return cdf
-
-
-# ---------- 난수/샘플 ----------
-
-def _build_alias_from_cdf(cdf: List[float]) -> Tuple[List[float], List[int]]:
-    """Walker's Alias Method를 위한 전처리 테이블 생성
+# ---------- SVG (이전 방식, 비교용) ----------
+def hist_path_absolute(density: List[float]) -> str:
+    """이전 히스토그램 path 인코딩 (bin마다 절대좌표 "L x y" 2개, 소수 2자리)
 
-    CDF에서 PMF를 추출하고 O(1) 샘플링을 위한 alias 테이블 구성
+    compute._hist_path와의 시각적 동등성 확인(tools/svg_equivalence.py)용으로만 보존합니다.
 
     Args:
-        cdf: 누적분포함수 (정규화되지 않아도 됨)
+        density: 구간별 밀도 (len = bins)
 
     Returns:
-        (prob, alias): Alias Method용 확률 테이블과 별칭 테이블
+        path d 문자열
     """
-    # 리스트 컴프리헨션으로 PMF 추출 (최적화)
-    M = len(cdf)
-    pmf = [cdf[0]] + [cdf[i] - cdf[i-1] for i in range(1, M)]
-    s = sum(pmf)
-    if s <= 0:
-        raise ValueError("Invalid CDF: sum must be positive")
-
-    # 정규화 및 스케일링을 한 번에 처리
-    scaled = [p * M / s for p in pmf]
-
-    # 초기 분류
-    small = [i for i, v in enumerate(scaled) if v < 1.0]
-    large = [i for i, v in enumerate(scaled) if v >= 1.0]
+    bins = len(density)
+    innerW, innerH = SVG_W - SVG_L - SVG_R, SVG_H - SVG_T - SVG_B
+    y_max = max(density) if density else 1.0
 
-    prob = [0.0] * M
-    alias = [0] * M
+    def sx(i): return SVG_L + i * (innerW / bins)
+    def sy(y): return SVG_T + innerH - y * (innerH / y_max)
 
-    while small and large:
-        s_i = small.pop()
-        l_i = large.pop()
-        prob[s_i] = scaled[s_i]
-        alias[s_i] = l_i
-        scaled[l_i] = scaled[l_i] + scaled[s_i] - 1.0
-        (small if scaled[l_i] < 1.0 else large).append(l_i)
+    y0 = 0.0
+    threshold = y_max * 1e-5
+    path_parts = [f"M {sx(0):.2f} {sy(0.0):.2f}"]
+    for i, d in enumerate(density):
+        d_val = 0.0 if d < threshold else d
+        path_parts.extend([f"L {sx(i+1):.2f} {sy(y0):.2f}", f"L {sx(i+1):.2f} {sy(d_val):.2f}"])
+        y0 = d_val
+    path_parts.append(f"L {sx(bins):.2f} {sy(0):.2f} Z")
+    return " ".join(path_parts)
 
-    for i in large + small:
-        prob[i] = 1.0
-    return prob, alias
 
+# ---------- 난수/샘플 ----------
 
 def _alias_sample(prob: List[float], alias: List[int]) -> int:
     """Alias Method를 이용한 O(1) 샘플링
@@ -151,7 +126,8 @@ def _binomial_7(p: float) -> int:
 
 
 def sample_total_draws(n_sims: int, base_episodes: int,
-                       cdf: List[float], ceil_ratio: float, seed: int) -> List[int]:
+                       cdf: List[float], ceil_ratio: float, seed: int,
+                       alias_table: Tuple[List[float], List[int]] = None) -> List[int]:
     """몬테카를로 시뮬레이션: 총 뽑기 횟수 분포 생성
 
     Args:
@@ -160,6 +136,7 @@ def sample_total_draws(n_sims: int, base_episodes: int,
         cdf: 단일 에피소드의 CDF
         ceil_ratio: 추가 에피소드 발생 확률
         seed: 난수 시드
+        alias_table: cdf의 (prob, alias) (compute.pity_alias 메모), None이면 cdf로 생성
 
     Returns:
         각 시뮬레이션의 총 뽑기 횟수 리스트
@@ -168,7 +145,7 @@ def sample_total_draws(n_sims: int, base_episodes: int,
     random.seed(seed)
 
     # Alias 테이블 전처리
-    prob, alias = _build_alias_from_cdf(cdf)
+    prob, alias = alias_table if alias_table is not None else _build_alias_from_cdf(cdf)
 
     # 로컬 변수로 함수 참조 캐싱 (속도 향상)
     _rand = random.random
@@ -190,8 +167,65 @@ def sample_total_draws(n_sims: int, base_episodes: int,
     return totals
 
 
+SAMPLE_CHUNK_SIZE = 50_000  # 배치 샘플러의 청크당 시뮬레이션 수 (청크당 메모리 ~30MB)
+
+
+def sample_total_draws_batched(n_sims: int, base_episodes: int,
+                               cdf: List[float], ceil_ratio: float, seed: int,
+                               chunk_size: int = SAMPLE_CHUNK_SIZE,
+                               alias_table: Tuple[List[float], List[int]] = None):
+    """NumPy 배치 몬테카를로 시뮬레이션: 총 뽑기 횟수 분포 생성
+
+    sample_total_draws와 같은 모델(B(7, ceil_ratio) 추가 에피소드 + alias 샘플링)을
+    청크 단위 배열 연산으로 계산합니다. 같은 seed/chunk_size면 결과가 재현됩니다
+    (난수 스트림이 다르므로 sample_total_draws와 값은 다름).
+    처리량은 sample_total_draws의 ~9-13배입니다 (에피소드당 NumPy 원소 연산이 하한, PERFORMANCE.md 참고).
+
+    Args:
+        n_sims: 시뮬레이션 반복 횟수
+        base_episodes: 기본 에피소드 수
+        cdf: 단일 에피소드의 CDF
+        ceil_ratio: 추가 에피소드 발생 확률
+        seed: 난수 시드
+        chunk_size: 청크당 시뮬레이션 수 (메모리 상한)
+        alias_table: cdf의 (prob, alias) (compute.pity_alias 메모), None이면 cdf로 생성
+
+    Returns:
+        각 시뮬레이션의 총 뽑기 횟수 (NumPy int64 배열)
+    """
+    if np is None:
+        raise ImportError("sample_total_draws_batched requires NumPy")
+
+    rng = np.random.default_rng(seed)
+
+    # Alias 테이블 전처리
+    prob, alias = alias_table if alias_table is not None else _build_alias_from_cdf(cdf)
+    prob = np.asarray(prob, dtype=np.float64)
+    alias = np.asarray(alias, dtype=np.int64)
+    M = len(prob)
+
+    totals = np.empty(n_sims, dtype=np.int64)
+    for start in range(0, n_sims, chunk_size):
+        m = min(chunk_size, n_sims - start)
+
+        # 시뮬레이션별 에피소드 수 k = base + B(7, ceil_ratio)
+        k = base_episodes + rng.binomial(7, ceil_ratio, size=m)
+        ends = np.cumsum(k)
+
+        # 모든 에피소드를 한 번에 alias 샘플링 (1-indexed 시도수)
+        idx = rng.integers(0, M, size=int(ends[-1]))
+        draws = np.where(rng.random(idx.size) < prob[idx], idx, alias[idx]) + 1
+
+        # 구간 합: 누적합 차분 (k = 0인 시뮬레이션도 0으로 처리)
+        cs = np.concatenate(([0], np.cumsum(draws)))
+        totals[start:start + m] = cs[ends] - cs[ends - k]
+
+    return totals
+
+
 # ---------- 사전 계산 데이터 생성 ----------
-def generate_precomputed_data(game_id: int, goal_range: range, n_sims: int = N_SIMS, seed: int = SEED):
+def generate_precomputed_data(game_id: int, goal_range: range, n_sims: int = N_SIMS, seed: int = SEED,
+                              sampler=sample_total_draws):
     """goal 범위에 대해 시뮬레이션 실행 후 압축 데이터 생성
 
     Args:
@@ -199,6 +233,7 @@ def generate_precomputed_data(game_id: int, goal_range: range, n_sims: int = N_S
         goal_range: goal 범위 (예: range(1, 21) → 1~20)
         n_sims: 시뮬레이션 횟수
         seed: 난수 시드
+        sampler: 샘플러 함수 (sample_total_draws 또는 sample_total_draws_batched)
 
     Returns:
         2차원 리스트 구조:
@@ -214,8 +249,9 @@ def generate_precomputed_data(game_id: int, goal_range: range, n_sims: int = N_S
     if not cfg:
         raise ValueError(f"Unknown GAME_ID: {game_id}")
 
-    # CDF는 한 번만 계산
+    # CDF/Alias 테이블은 한 번만 계산 (파라미터별 메모)
     cdf = build_pity_cdf(game_id)
+    alias_table = pity_alias(game_id)
 
     # 결과 저장 구조
     result = [list(goal_range)]  # index 0: goal 리스트
@@ -226,12 +262,13 @@ def generate_precomputed_data(game_id: int, goal_range: range, n_sims: int = N_S
         print(f"  Processing goal={goal}...", end=" ")
 
         # 시뮬레이션 실행
-        totals = sample_total_draws(
+        totals = sampler(
             n_sims=n_sims,
             base_episodes=goal,
             cdf=cdf,
             ceil_ratio=cfg["CEIL_RATIO"],
             seed=seed + goal,  # goal마다 다른 시드
+            alias_table=alias_table,
         )
 
         # 압축
@@ -249,95 +286,123 @@ def generate_precomputed_data(game_id: int, goal_range: range, n_sims: int = N_S
     return result
 
 
-def save_precomputed_data(data, filepath: str):
+def save_precomputed_data(data, filepath: str, game_id: int = None, asset_dir: str = None):
     """압축 데이터를 JSON 파일로 저장
 
     Args:
         data: generate_precomputed_data의 반환값
         filepath: 저장 경로 (예: "precomputed_game1.json")
+        game_id: 게임 ID (asset_dir 지정 시 필수)
+        asset_dir: 지정하면 배포용 바이너리/goal별 샤드/manifest도 저장 (예: "assets/data")
     """
     import json
     with open(filepath, 'w') as f:
         json.dump(data, f)
     print(f"Saved to {filepath}")
 
-
-def load_precomputed_data(filepath: str):
-    """저장된 압축 데이터 불러오기
-
-    Args:
-        filepath: 파일 경로
-
-    Returns:
-        2차원 리스트 데이터
-    """
-    import json
-    with open(filepath, 'r') as f:
-        return json.load(f)
+    if asset_dir:
+        save_precomputed_assets(data, game_id, asset_dir)
 
 
-async def load_precomputed_from_assets(assets_binding, game_id: int, goal: int):
-    """Assets에서 사전 계산된 압축 데이터 불러오기
+def write_compressed_variants(path: str) -> Dict:
+    """에셋 옆에 .gz(및 brotli가 있으면 .br) 압축 변형 저장
 
     Args:
-        assets_binding: Cloudflare Assets 바인딩 객체
-        game_id: 게임 ID (1 또는 2)
-        goal: 목표 획득 수
+        path: 원본 에셋 경로
 
     Returns:
-        압축된 시뮬레이션 데이터 [min_val, freq_list] 또는 None
+        manifest 파일 항목 {"bytes": 원본 크기, "encodings": {encoding: 압축 크기}}
     """
-    import json
-    from workers import Request
+    import gzip
 
-    # 정적 파일 경로
-    asset_path = f"https://dummy/data/precomputed_game{game_id}_v2.json"
+    with open(path, 'rb') as f:
+        raw = f.read()
 
-    try:
-        # Assets에서 JSON 파일 가져오기 (~1-3ms)
-        asset_req = Request(asset_path, method="GET")
-        response = await assets_binding.fetch(asset_req)
+    encodings = {}
+    for encoding, suffix in _compressed_variants():
+        if encoding == "br":
+            packed = brotli.compress(raw, quality=11)
+        else:
+            packed = gzip.compress(raw, compresslevel=9, mtime=0)  # mtime=0: 재생성해도 동일한 바이트
+        with open(path + suffix, 'wb') as f:
+            f.write(packed)
+        encodings[encoding] = len(packed)
+    return {"bytes": len(raw), "encodings": encodings}
 
-        if response.status != 200:
-            print(f"Asset not found: {asset_path}")
-            return None
 
-        # JSON 파싱
-        full_data = await response.json()
+def save_precomputed_assets(data, game_id: int, asset_dir: str) -> Dict:
+    """배포용 에셋 저장: 게임 전체 바이너리 + (game, goal)별 샤드 + manifest 갱신
 
-        # 첫 번째 배열은 키 목록, 나머지는 데이터
-        keys = full_data[0]
+    생성 파일:
+        {asset_dir}/precomputed_game{N}.bin   게임 전체 (구 배포 호환 폴백)
+        {asset_dir}/game{N}/{goal}.bin        goal 1개짜리 샤드 (~1KB)
+        {asset_dir}/manifest.json             게임별 goal 목록/경로, 파일별 크기/압축 변형, 데이터 버전
+        각 바이너리 옆에 .gz (brotli 설치 시 .br) 압축 변형
 
-        # goal에 해당하는 인덱스 찾기
-        if goal in keys:
-            index = keys.index(goal) + 1  # +1은 keys 배열 다음부터 데이터
-            return full_data[index]  # [min_val, freq_list]
+    Args:
+        data: generate_precomputed_data의 반환값 (또는 v2 형식)
+        game_id: 게임 ID
+        asset_dir: 에셋 디렉토리
 
-        return None
-    except Exception as e:
-        print(f"Error loading from assets (game{game_id}_{goal}): {e}")
-        return None
+    Returns:
+        manifest의 게임 항목
+    """
+    import hashlib
+    import json
+    import os
+    from .packed import pack_precomputed
+
+    goals = data[0]
+    files = {}
+
+    def write_asset(name: str, payload: bytes) -> None:
+        path = os.path.join(asset_dir, name)
+        with open(path, 'wb') as f:
+            f.write(payload)
+        files[name] = write_compressed_variants(path)
+
+    combined = f"precomputed_game{game_id}.bin"
+    write_asset(combined, pack_precomputed(data))
+
+    shard_dir = os.path.join(asset_dir, f"game{game_id}")
+    os.makedirs(shard_dir, exist_ok=True)
+    for index, goal in enumerate(goals, start=1):
+        write_asset(f"game{game_id}/{goal}.bin", pack_precomputed([[goal], data[index]]))
+
+    # manifest 갱신 (다른 게임 항목은 유지)
+    manifest_path = os.path.join(asset_dir, MANIFEST_NAME)
+    manifest = {"games": {}, "files": {}}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+    entry = {"goals": list(goals), "combined": combined, "shards": f"game{game_id}/{{goal}}.bin"}
+    manifest["games"][str(game_id)] = entry
+    manifest.setdefault("files", {}).update(files)
+
+    # 데이터 버전: 모든 게임 바이너리의 해시 (캐시 무효화/ETag용)
+    digest = hashlib.sha256()
+    for key in sorted(manifest["games"]):
+        with open(os.path.join(asset_dir, manifest["games"][key]["combined"]), 'rb') as f:
+            digest.update(f.read())
+    manifest["version"] = digest.hexdigest()[:16]
+
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Saved {len(goals)} shards to {shard_dir} (manifest version {manifest['version']})")
+    return entry
 
 
-async def load_precomputed_from_kv(kv_store, game_id: int, goal: int):
-    """KV에서 사전 계산된 압축 데이터 불러오기 (폴백)
+def load_precomputed_data(filepath: str):
+    """저장된 압축 데이터 불러오기
 
     Args:
-        kv_store: Cloudflare KV 스토어 객체
-        game_id: 게임 ID (1 또는 2)
-        goal: 목표 획득 수
+        filepath: 파일 경로
 
     Returns:
-        압축된 시뮬레이션 데이터 [min_val, freq_list] 또는 None
+        2차원 리스트 데이터
     """
     import json
-    kv_key = f"game{game_id}_{goal}"
-
-    try:
-        data_str = await kv_store.get(kv_key)
-        if data_str:
-            return json.loads(data_str)
-        return None
-    except Exception as e:
-        print(f"Error loading from KV ({kv_key}): {e}")
-        return None
+    with open(filepath, 'r') as f:
+        return json.load(f)
+
+
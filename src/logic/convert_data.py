@@ -2,8 +2,22 @@
 # -*- coding: utf-8 -*-
 """
 기존 데이터를 0부터 시작하는 형식으로 변환
+
+바이너리 형식(precomputed_game{N}.bin, logic/packed.py)도 함께 생성하고,
+assets/data에 배포용 바이너리 + goal별 샤드 + manifest.json과 .gz/.br 압축 변형을 저장합니다.
+실행 (src/logic 디렉토리에서): python convert_data.py
 """
 import json
+import os
+import sys
+
+# src를 import 경로에 추가 (logic 패키지 사용)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from logic.compute_not_used import MANIFEST_NAME, save_precomputed_assets, write_compressed_variants
+from logic.packed import pack_precomputed
+
+# 배포용 에셋 디렉토리 (바이너리/샤드/manifest 출력 위치)
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "assets", "data")
 
 def convert_precomputed_data(input_file, output_file):
     """기존 [min_val, freq] 형식을 0부터 시작하는 freq로 변환"""
@@ -34,7 +48,36 @@ def convert_precomputed_data(input_file, output_file):
     print(f"  Original format: [min_val, freq]")
     print(f"  New format: freq (0-indexed)")
 
+def convert_to_packed(input_file, output_file):
+    """[min_val, freq] 형식 JSON을 바이너리 형식으로 변환"""
+    with open(input_file, 'r') as f:
+        data = json.load(f)
+
+    packed = pack_precomputed(data)
+    with open(output_file, 'wb') as f:
+        f.write(packed)
+
+    print(f"Converted {input_file} -> {output_file}")
+    print(f"  Size: {os.path.getsize(input_file):,} bytes (JSON) -> {len(packed):,} bytes (binary)")
+
 if __name__ == "__main__":
     convert_precomputed_data("precomputed_game1.json", "precomputed_game1_v2.json")
     convert_precomputed_data("precomputed_game2.json", "precomputed_game2_v2.json")
+    convert_to_packed("precomputed_game1.json", "precomputed_game1.bin")
+    convert_to_packed("precomputed_game2.json", "precomputed_game2.bin")
+    for game_id in (1, 2):
+        with open(f"precomputed_game{game_id}.json", 'r') as f:
+            save_precomputed_assets(json.load(f), game_id, ASSET_DIR)
+
+    # 배포용 JSON v2 (구 배포 호환) 복사 + 압축 변형, manifest에 파일 정보 기록
+    manifest_path = os.path.join(ASSET_DIR, MANIFEST_NAME)
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+    for game_id in (1, 2):
+        name = f"precomputed_game{game_id}_v2.json"
+        with open(name, 'rb') as src, open(os.path.join(ASSET_DIR, name), 'wb') as dst:
+            dst.write(src.read())
+        manifest["files"][name] = write_compressed_variants(os.path.join(ASSET_DIR, name))
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
     print("\nConversion complete!")
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+계층형 사전 계산 데이터 소스 (read-through): isolate 메모리 → Cache API → ASSETS → KV
+
+위 계층에서 미스가 나면 아래 계층을 차례로 조회하고, 찾으면 위 계층을 채웁니다
+(메모리는 즉시, Cache API는 ctx.waitUntil로 응답 이후).
+    memory  loader의 isolate LRU 캐시 (ASSET_CACHE_MAX_GOALS)
+    cache   colo Cache API (edge_cache), 키에 데이터 버전 포함, PCD1 바이너리 1 goal
+    assets  ASSETS 바인딩 (manifest 샤드 → 게임 전체 바이너리 → JSON)
+    kv      GLOBAL_STORE "game{N}_{goal}" (에셋에 없는 goal을 운영 중에 추가하는 용도)
+
+stale-while-revalidate: 변경 가능한 계층(cache/kv)에서 온 메모리 엔트리는 REFRESH_AFTER_S가 지나면
+그대로 응답하면서 백그라운드로 ASSETS → KV를 다시 읽어 메모리/Cache API를 갱신합니다.
+ASSETS에서 온 엔트리는 배포 단위로 고정이므로(캐시 키에 버전 포함) 갱신하지 않습니다.
+
+계층별 hit/miss 카운터는 stats() (GET /api/stats의 "tiers"), 계층별 소요 시간은 span "load.cache" 등.
+"""
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from . import edge_cache, tracing
+from .compute import GAME_TABLE, split_precomputed
+from .exact import DERIVE_MAX_GOAL
+from .loader import (
+    cached_precomputed, data_version, fetch_precomputed_from_assets, load_precomputed_from_kv, store_precomputed,
+)
+from .packed import PackedReader, pack_precomputed
+
+TIERS = ("memory", "cache", "assets", "kv")
+REFRESH_AFTER_S = 300.0        # cache/kv 출처 메모리 엔트리를 백그라운드 갱신할 나이 (초)
+CACHE_TIER_TTL_S = 3600        # Cache API 사본 보관 기간 (KV 변경이 이 시간 안에 반영)
+CACHE_TIER_ORIGIN = "https://precomputed.cache"   # Cache API 키용 가상 origin (실제 요청 없음)
+# 출처/적재 시각, 부재 기록을 기억할 최대 (game, goal) 수 (유효한 키 전체를 담는 크기)
+ENTRY_META_MAX = len(GAME_TABLE) * DERIVE_MAX_GOAL
+NEGATIVE_TTL_S = 60.0          # 모든 계층에서 없던 (game, goal)을 다시 조회하지 않는 시간 (런타임 유도 goal)
+
+# 계층 → {"hits", "misses"} (isolate 단위 누적)
+_STATS: Dict[str, Dict[str, int]] = {tier: {"hits": 0, "misses": 0} for tier in TIERS}
+# 갱신 관련 누적: stale 응답 수 / 백그라운드 갱신 실행·실패 수
+_REFRESH_STATS = {"stale_served": 0, "refreshes": 0, "refresh_failures": 0}
+# (game_id, goal) → (출처 계층, 적재 시각 monotonic)
+_META: Dict[Tuple[int, int], Tuple[str, float]] = {}
+# 백그라운드 갱신 중인 (game_id, goal) (중복 갱신 방지)
+_REFRESHING: set = set()
+# 모든 계층에서 없던 (game_id, goal) → 조회 시각 (요청마다 Cache API/KV 왕복 방지)
+_NEGATIVE: Dict[Tuple[int, int], float] = {}
+
+
+def validate_key(game_id: int, goal: int) -> None:
+    """조회 가능한 (game_id, goal)인지 확인 (임의 입력이 ASSETS/KV/Cache API 조회나 캐시 항목을 만들지 않도록)
+
+    Raises:
+        ValueError: 알 수 없는 game_id 또는 1 ~ DERIVE_MAX_GOAL 밖의 goal
+    """
+    if game_id not in GAME_TABLE:
+        raise ValueError(f"Unknown GAME_ID: {game_id}")
+    if not 1 <= goal <= DERIVE_MAX_GOAL:
+        raise ValueError(f"goal must be between 1 and {DERIVE_MAX_GOAL}: {goal}")
+
+
+def _count(tier: str, hit: bool) -> None:
+    _STATS[tier]["hits" if hit else "misses"] += 1
+
+
+def _remember(game_id: int, goal: int, tier: str) -> None:
+    if len(_META) >= ENTRY_META_MAX and (game_id, goal) not in _META:
+        _META.clear()  # 메모리 캐시 LRU와 따로 움직이므로 상한만 유지 (모르는 엔트리는 새것으로 취급)
+    _META[(game_id, goal)] = (tier, time.monotonic())
+
+
+def _cache_url(version: str, game_id: int, goal: int) -> str:
+    return f"{CACHE_TIER_ORIGIN}/{version}/game{game_id}/{goal}.bin"
+
+
+async def _cache_get(env, game_id: int, goal: int):
+    """Cache API 계층 조회 → [min_val, freq] 또는 None"""
+    version = await data_version(env.ASSETS)
+    cached = await edge_cache.match(_cache_url(version, game_id, goal))
+    if cached is None:
+        return None
+    body, _ = cached
+    try:
+        return PackedReader(body).read(goal)
+    except Exception as e:
+        print(f"[datasource] invalid cache entry game{game_id}/{goal}: {e}")
+        return None
+
+
+async def _cache_put(env, game_id: int, goal: int, entry) -> None:
+    """Cache API 계층 채우기 (PCD1 바이너리, goal 1개)"""
+    version = await data_version(env.ASSETS)
+    await edge_cache.put(_cache_url(version, game_id, goal), pack_precomputed([[goal], entry]), {
+        "Content-Type": "application/octet-stream",
+        "Cache-Control": f"public, max-age={CACHE_TIER_TTL_S}",
+    })
+
+
+async def _load_origin(env, game_id: int, goal: int) -> Tuple[Optional[list], Optional[str]]:
+    """원본 계층(ASSETS → KV) 조회 → ([min_val, freq], 계층) 또는 (None, None)"""
+    with tracing.span("assets"):
+        entry = await fetch_precomputed_from_assets(env.ASSETS, game_id, goal)
+    _count("assets", entry is not None)
+    if entry is not None:
+        return entry, "assets"
+
+    store = getattr(env, "GLOBAL_STORE", None)
+    if store is None:
+        return None, None
+    with tracing.span("kv"):
+        data = await load_precomputed_from_kv(store, game_id, goal)
+    _count("kv", bool(data))
+    if not data:
+        return None, None
+    return list(split_precomputed(data)), "kv"
+
+
+async def _refresh(env, game_id: int, goal: int) -> None:
+    """stale 엔트리 백그라운드 갱신 (ASSETS → KV 재조회 → 메모리/Cache API 갱신)"""
+    _REFRESH_STATS["refreshes"] += 1
+    try:
+        entry, tier = await _load_origin(env, game_id, goal)
+        if entry is None:
+            _REFRESH_STATS["refresh_failures"] += 1
+            return
+        store_precomputed(game_id, goal, entry)
+        _remember(game_id, goal, tier)
+        await _cache_put(env, game_id, goal, entry)
+    except Exception as e:
+        _REFRESH_STATS["refresh_failures"] += 1
+        print(f"[datasource] refresh failed game{game_id}/{goal}: {e}")
+    finally:
+        _REFRESHING.discard((game_id, goal))
+
+
+async def load_precomputed(env, game_id: int, goal: int, defer: Callable = None):
+    """계층형 조회: memory → cache → assets → kv
+
+    Args:
+        env: Workers env (ASSETS, GLOBAL_STORE 바인딩)
+        game_id: 게임 ID
+        goal: 목표 획득 수
+        defer: 코루틴을 응답 이후로 미루는 함수 (entry.Default._defer → ctx.waitUntil),
+               None이면 Cache API 채우기/백그라운드 갱신 생략
+
+    Returns:
+        ([min_val, freq], 응답한 계층) 또는 (None, None) (없으면 NEGATIVE_TTL_S 동안 재조회 생략)
+
+    Raises:
+        ValueError: 알 수 없는 game_id 또는 1 ~ DERIVE_MAX_GOAL 밖의 goal (어떤 계층도 조회하지 않음)
+    """
+    validate_key(game_id, goal)
+    key = (game_id, goal)
+    entry = cached_precomputed(game_id, goal)
+    _count("memory", entry is not None)
+    if entry is not None:
+        source, loaded_at = _META.get(key, ("assets", None))
+        if source != "assets" and loaded_at is not None and time.monotonic() - loaded_at > REFRESH_AFTER_S:
+            _REFRESH_STATS["stale_served"] += 1
+            if defer is not None and key not in _REFRESHING:
+                _REFRESHING.add(key)
+                defer(_refresh(env, game_id, goal))
+        return entry, "memory"
+
+    missed_at = _NEGATIVE.get(key)
+    if missed_at is not None:
+        if time.monotonic() - missed_at < NEGATIVE_TTL_S:
+            return None, None
+        del _NEGATIVE[key]
+
+    with tracing.span("cache"):
+        entry = await _cache_get(env, game_id, goal)
+    _count("cache", entry is not None)
+    if entry is not None:
+        store_precomputed(game_id, goal, entry)
+        _remember(game_id, goal, "cache")
+        return entry, "cache"
+
+    entry, tier = await _load_origin(env, game_id, goal)
+    if entry is None:
+        if len(_NEGATIVE) >= ENTRY_META_MAX:
+            _NEGATIVE.clear()
+        _NEGATIVE[key] = time.monotonic()
+        return None, None
+    # fetch_precomputed_from_assets는 메모리 캐시를 직접 채움 (JSON 폴백은 게임 전체)
+    if tier != "assets":
+        store_precomputed(game_id, goal, entry)
+    _remember(game_id, goal, tier)
+    if defer is not None:
+        defer(_cache_put(env, game_id, goal, entry))
+    return entry, tier
+
+
+def stats() -> Dict:
+    """계층별 {hits, misses, hit_rate} + 갱신 카운터 (isolate 누적)"""
+    out = {}
+    for tier in TIERS:
+        hits, misses = _STATS[tier]["hits"], _STATS[tier]["misses"]
+        lookups = hits + misses
+        out[tier] = {"hits": hits, "misses": misses,
+                     "hit_rate": round(hits / lookups, 4) if lookups else None}
+    out["refresh"] = dict(_REFRESH_STATS)
+    return out
+
+
+def reset() -> None:
+    """카운터/출처 기록 초기화 (메모리 캐시 자체는 loader.invalidate_precomputed_cache)"""
+    for counts in _STATS.values():
+        counts["hits"] = counts["misses"] = 0
+    for name in _REFRESH_STATS:
+        _REFRESH_STATS[name] = 0
+    _META.clear()
+    _NEGATIVE.clear()
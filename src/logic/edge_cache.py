@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP 캐시 유틸: 강한 ETag / 조건부 요청 + Cloudflare Cache API (colo 단위)
+
+Cache API(caches.default)는 JS 전역이라 Workers 런타임(Pyodide)에서만 import됩니다.
+로컬 도구(tools/local)는 set_backend()로 같은 match/put 인터페이스의 대역을 넣습니다.
+백엔드가 없으면(로컬 기본, workers.dev 등) match는 항상 미스, put은 무시됩니다.
+"""
+import hashlib
+from typing import Dict, Optional, Tuple
+
+try:
+    from js import Object, Response as JsResponse, caches
+    from pyodide.ffi import to_js
+except ImportError:  # 로컬 도구/데이터 생성에서는 js 모듈 없음
+    caches = None
+
+
+class _JsCache:
+    """caches.default 래퍼 (Python bytes/dict ↔ JS Response 변환)"""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    async def match(self, url: str) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        response = await self.cache.match(url)
+        if response is None:
+            return None
+        buffer = await response.arrayBuffer()
+        headers = {key: value for key, value in response.headers.entries()}
+        return buffer.to_bytes(), headers
+
+    async def put(self, url: str, body: bytes, headers: Dict[str, str]) -> None:
+        init = to_js({"headers": headers}, dict_converter=Object.fromEntries)
+        await self.cache.put(url, JsResponse.new(to_js(body), init))
+
+
+_BACKEND = _JsCache(caches.default) if caches is not None else None
+
+
+def set_backend(backend) -> None:
+    """Cache API 백엔드 교체 (match(url) / put(url, body, headers), None이면 비활성화)"""
+    global _BACKEND
+    _BACKEND = backend
+
+
+async def match(url: str) -> Optional[Tuple[bytes, Dict[str, str]]]:
+    """캐시된 (본문 bytes, 헤더) 또는 None (백엔드 없음/오류도 미스로 처리)"""
+    if _BACKEND is None:
+        return None
+    try:
+        return await _BACKEND.match(url)
+    except Exception as e:
+        print(f"[edge_cache] match failed: {e}")
+        return None
+
+
+async def put(url: str, body, headers: Dict[str, str]) -> None:
+    """응답 저장 (보관 기간은 headers의 Cache-Control max-age, 실패해도 요청에는 영향 없음)"""
+    if _BACKEND is None:
+        return
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    try:
+        await _BACKEND.put(url, body, headers)
+    except Exception as e:
+        print(f"[edge_cache] put failed: {e}")
+
+
+def strong_etag(*parts) -> str:
+    """입력값으로 결정되는 강한 ETag (예: '"3f1c9a0b2d4e6f70"')"""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8"))
+    return f'"{digest.hexdigest()[:16]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더가 etag와 일치하는지 (목록/"*"/W/ 접두사 허용, RFC 9110 약한 비교)
+
+    Args:
+        if_none_match: 요청 헤더 값 (없으면 None)
+        etag: 현재 응답의 ETag
+
+    Returns:
+        일치하면 True (304 응답 가능)
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
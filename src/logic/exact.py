@@ -0,0 +1,445 @@
+# -*- coding: utf-8 -*-
+"""
+총 뽑기 횟수 분포의 정확한 계산 (PMF 합성곱)
+
+몬테카를로 없이 단일 에피소드 PMF의 k중 합성곱과
+추가 에피소드 수 B(7, CEIL_RATIO)의 혼합으로 분포를 직접 구합니다.
+
+    P(total = v) = Σ_b C(7, b) r^b (1-r)^(7-b) · pmf^{*(goal + b)}(v)
+
+NumPy가 있으면 벡터화(큰 배열은 FFT) 합성곱을, 없으면 순수 Python 합성곱을 사용합니다.
+"""
+from collections import OrderedDict
+from math import comb, floor
+from typing import Dict, List, Tuple
+
+from .compute import GAME_TABLE, N_SIMS, pity_pmf
+
+try:
+    import numpy as np
+except ImportError:  # Pyodide 등 NumPy가 없는 환경
+    np = None
+
+EXTRA_EPISODES = 7      # 추가 에피소드 시도 횟수 (B(7, CEIL_RATIO))
+FFT_MIN_SIZE = 2048     # 두 배열 길이의 곱이 이 값의 제곱 이상이면 FFT 사용
+
+
+# ---------- PMF ----------
+def episode_pmf(game_id: int) -> List[float]:
+    """단일 에피소드 시도수 T의 PMF (index = 시도수, pmf[0] = 0)
+
+    compute.pity_pmf의 메모된 테이블을 그대로 반환하므로 수정하지 않습니다.
+
+    Args:
+        game_id: 게임 ID (1 또는 2)
+
+    Returns:
+        길이 MAX_T + 1 리스트, pmf[t] = P(T = t)
+    """
+    return pity_pmf(game_id)
+
+
+def convolve(a, b):
+    """두 PMF의 합성곱 (index = 값이므로 결과 index도 값의 합)
+
+    Args:
+        a, b: 확률 리스트 또는 NumPy 배열
+
+    Returns:
+        길이 len(a) + len(b) - 1의 합성곱 (NumPy 사용 시 배열)
+    """
+    if np is not None:
+        a = np.asarray(a, dtype=np.float64)
+        b = np.asarray(b, dtype=np.float64)
+        n = len(a) + len(b) - 1
+        if len(a) * len(b) >= FFT_MIN_SIZE * FFT_MIN_SIZE:
+            size = 1 << (n - 1).bit_length()
+            out = np.fft.irfft(np.fft.rfft(a, size) * np.fft.rfft(b, size), size)[:n]
+            return np.maximum(out, 0.0)  # FFT 반올림 오차로 생긴 음수 제거
+        return np.convolve(a, b)
+
+    # 순수 Python 합성곱 (0이 아닌 항만 순회)
+    out = [0.0] * (len(a) + len(b) - 1)
+    nz_b = [(j, y) for j, y in enumerate(b) if y]
+    for i, x in enumerate(a):
+        if x:
+            for j, y in nz_b:
+                out[i + j] += x * y
+    return out
+
+
+def convolve_power(pmf, k: int):
+    """pmf의 k중 합성곱 (제곱을 이용한 거듭제곱, 합성곱 O(log k)회)
+
+    Args:
+        pmf: 단일 에피소드 PMF
+        k: 거듭제곱 횟수 (k >= 0)
+
+    Returns:
+        pmf^{*k} (k = 0이면 [1.0])
+    """
+    result = [1.0]
+    base = pmf
+    while k > 0:
+        if k & 1:
+            result = convolve(result, base)
+        k >>= 1
+        if k:
+            base = convolve(base, base)
+    return result
+
+
+def mix_extra_episodes(base, pmf, ceil_ratio: float):
+    """goal 에피소드 분포 base에 추가 에피소드 B(7, ceil_ratio)를 혼합
+
+    Args:
+        base: pmf^{*goal}
+        pmf: 단일 에피소드 PMF
+        ceil_ratio: 추가 에피소드 발생 확률
+
+    Returns:
+        총 뽑기 횟수 PMF (index = 총 뽑기 횟수)
+    """
+    weights = [comb(EXTRA_EPISODES, b) * ceil_ratio ** b * (1.0 - ceil_ratio) ** (EXTRA_EPISODES - b)
+               for b in range(EXTRA_EPISODES + 1)]
+    size = len(base) + EXTRA_EPISODES * (len(pmf) - 1)
+
+    if np is not None:
+        total = np.zeros(size)
+        cur = np.asarray(base, dtype=np.float64)
+        for b, w in enumerate(weights):
+            if b:
+                cur = convolve(cur, pmf)
+            total[:len(cur)] += w * cur
+        return total
+
+    total = [0.0] * size
+    cur = list(base)
+    for b, w in enumerate(weights):
+        if b:
+            cur = convolve(cur, pmf)
+        for i, p in enumerate(cur):
+            total[i] += w * p
+    return total
+
+
+def total_draws_pmf(game_id: int, goal: int):
+    """(game_id, goal)의 총 뽑기 횟수 정확한 PMF
+
+    Args:
+        game_id: 게임 ID (1 또는 2)
+        goal: 목표 획득 수
+
+    Returns:
+        PMF (index = 총 뽑기 횟수)
+    """
+    cfg = GAME_TABLE.get(int(game_id))
+    if not cfg:
+        raise ValueError(f"Unknown GAME_ID: {game_id}")
+    if goal < 0:
+        raise ValueError(f"goal must be non-negative: {goal}")
+
+    pmf = episode_pmf(game_id)
+    return mix_extra_episodes(convolve_power(pmf, goal), pmf, cfg["CEIL_RATIO"])
+
+
+# ---------- 정수 빈도 변환 ----------
+def scale_to_counts(probs, n_sims: int = N_SIMS) -> Tuple[int, List[int]]:
+    """확률을 합이 정확히 n_sims인 정수 빈도로 변환 (최대 나머지 방식)
+
+    Args:
+        probs: PMF (index = 값)
+        n_sims: 빈도 합계 (기존 에셋의 샘플 수와 동일하게 1,000,000)
+
+    Returns:
+        (min_val, freq): compress_totals와 같은 형식 (양 끝 0 제거)
+    """
+    probs = [float(p) for p in probs]
+    total_p = sum(probs)
+    if total_p <= 0:
+        return 0, []
+
+    raw = [p * n_sims / total_p for p in probs]
+    counts = [floor(x) for x in raw]
+    remainder = n_sims - sum(counts)
+    if remainder > 0:
+        order = sorted(range(len(raw)), key=lambda i: raw[i] - counts[i], reverse=True)
+        for i in order[:remainder]:
+            counts[i] += 1
+
+    first = next(i for i, c in enumerate(counts) if c)
+    last = len(counts) - 1
+    while counts[last] == 0:
+        last -= 1
+    return first, counts[first:last + 1]
+
+
+# ---------- 사전 계산 데이터 생성 ----------
+def generate_exact_precomputed_data(game_id: int, goal_range: range, n_sims: int = N_SIMS):
+    """goal 범위에 대해 정확한 분포를 계산해 generate_precomputed_data와 같은 형식으로 반환
+
+    Args:
+        game_id: 게임 ID (1 또는 2)
+        goal_range: goal 범위 (예: range(1, 21) → 1~20)
+        n_sims: 빈도 합계 (정수 스케일)
+
+    Returns:
+        [[goal 리스트], [min1, [freq1]], [min2, [freq2]], ...]
+    """
+    if not GAME_TABLE.get(int(game_id)):
+        raise ValueError(f"Unknown GAME_ID: {game_id}")
+
+    result = [list(goal_range)]
+    print(f"Starting exact computation for game_id={game_id}, scale={n_sims:,}")
+
+    for goal in goal_range:
+        min_val, freq = scale_to_counts(total_draws_pmf(game_id, goal), n_sims)
+        result.append([min_val, freq])
+        print(f"  goal={goal}: min={min_val}, freq_len={len(freq)}")
+
+    print("Exact computation complete!")
+    return result
+
+
+# ---------- 런타임 goal 유도 (goal > 20) ----------
+# 사전 계산 에셋에 없는 goal을 요청 처리 중에 계산합니다.
+# 단일 에피소드 PMF 거듭제곱을 isolate 메모리에 메모해 두고 요청 간에 재사용하며,
+# 추가 에피소드 혼합은 게임별 혼합 커널(Σ_b w_b · pmf^{*b}, import 시 계산)과의 합성곱 1회입니다.
+# 순수 Python 합성곱은 요청당 예산만큼만 진행하고 남은 부분은 다음 요청이 이어서 계산합니다
+# (그동안은 정규분포 혼합 근사로 응답, 몬테카를로 없음).
+DERIVE_MAX_GOAL = 200           # 런타임 유도 허용 최대 goal
+DERIVE_MAX_OPS = 1_000_000      # 요청당 순수 Python 합성곱 곱셈 횟수 상한 (~70ms)
+DERIVE_TRIM_EPS = 1e-13         # 이 값 미만 확률의 양 끝 구간은 잘라냄 (1e6 스케일에서 무시 가능)
+POWER_MEMO_MAX = 48             # 메모할 최대 (game_id, k) 거듭제곱 수 (2의 거듭제곱은 가장 나중에 제거)
+DERIVED_CACHE_MAX = 32          # 메모할 최대 (game_id, goal) 유도 결과 수 (정확/근사 각각)
+PENDING_MAX = 8                 # 이어서 계산할 미완료 합성곱 최대 수
+
+# (game_id, k) → (offset, probs): pmf^{*k}, probs[i] = P(sum = offset + i)
+_POWER_MEMO: "OrderedDict[Tuple[int, int], Tuple[int, list]]" = OrderedDict()
+# game_id → (offset, probs): 추가 에피소드 혼합 커널 Σ_b w_b · pmf^{*b}
+_MIX_KERNELS: Dict[int, Tuple[int, list]] = {}
+# (종류, game_id, k 또는 goal) → [b의 0이 아닌 항, 부분 결과, 다음 a 인덱스] (순수 Python 합성곱 진행 상태)
+_PENDING: "OrderedDict[Tuple, list]" = OrderedDict()
+# (game_id, goal, n_sims) → ([min_val, freq], method)
+_DERIVED_CACHE: "OrderedDict[Tuple[int, int, int], Tuple[List, str]]" = OrderedDict()
+# (game_id, goal, n_sims) → ([min_val, freq], "normal") (정확한 결과가 나오기 전까지만 사용)
+_APPROX_CACHE: "OrderedDict[Tuple[int, int, int], Tuple[List, str]]" = OrderedDict()
+
+
+class _BudgetExceeded(Exception):
+    """합성곱 연산 예산 초과"""
+
+
+class _OpsBudget:
+    """순수 Python 합성곱 곱셈 횟수 예산 (NumPy 사용 시 제한 없음)"""
+
+    def __init__(self, max_ops: int):
+        self.remaining = max_ops
+
+    def try_charge(self, ops: int) -> bool:
+        """ops만큼 남아 있으면 차감 후 True (NumPy 사용 시 항상 True)"""
+        if np is None:
+            if self.remaining < ops:
+                return False
+            self.remaining -= ops
+        return True
+
+
+def _trim(offset: int, probs) -> Tuple[int, list]:
+    """양 끝의 무시 가능한 확률(< DERIVE_TRIM_EPS) 구간 제거"""
+    probs = list(probs)
+    first, last = 0, len(probs) - 1
+    while first < last and probs[first] < DERIVE_TRIM_EPS:
+        first += 1
+    while last > first and probs[last] < DERIVE_TRIM_EPS:
+        last -= 1
+    return offset + first, probs[first:last + 1]
+
+
+def _lru_put(cache: OrderedDict, key, value, max_size: int) -> None:
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > max_size:
+        cache.popitem(last=False)
+
+
+def _memo_put(key, value) -> None:
+    """거듭제곱 메모 저장 (상한 초과 시 2의 거듭제곱이 아닌 오래된 항목부터 제거)"""
+    _POWER_MEMO[key] = value
+    _POWER_MEMO.move_to_end(key)
+    while len(_POWER_MEMO) > POWER_MEMO_MAX:
+        # 2의 거듭제곱은 모든 goal이 공유하고 다시 만드는 비용이 가장 크므로 남김
+        victim = next((k for k in _POWER_MEMO if k[1] & (k[1] - 1)), None)
+        if victim is None:
+            _POWER_MEMO.popitem(last=False)
+        else:
+            del _POWER_MEMO[victim]
+
+
+def _convolve_resumable(key: Tuple, a, b, budget: _OpsBudget) -> list:
+    """a * b 합성곱 (순수 Python이면 예산만큼 진행하고 나머지는 다음 호출이 이어서 계산)
+
+    Args:
+        key: 진행 상태 키 (같은 입력이면 같은 키)
+        a, b: 확률 리스트
+        budget: 이번 요청의 연산 예산
+
+    Returns:
+        합성곱 결과
+
+    Raises:
+        _BudgetExceeded: 예산 안에 끝나지 않음 (진행 상태는 _PENDING에 보관)
+    """
+    if np is not None:
+        return convolve(a, b)
+
+    state = _PENDING.pop(key, None)
+    if state is None or len(state[1]) != len(a) + len(b) - 1:
+        state = [[(j, y) for j, y in enumerate(b) if y], [0.0] * (len(a) + len(b) - 1), 0]
+    nz_b, out, i = state
+    row_ops = len(nz_b)
+    while i < len(a):
+        x = a[i]
+        if x:
+            if not budget.try_charge(row_ops):
+                state[2] = i
+                _lru_put(_PENDING, key, state, PENDING_MAX)
+                raise _BudgetExceeded()
+            for j, y in nz_b:
+                out[i + j] += x * y
+        i += 1
+    return out
+
+
+def _memo_power(game_id: int, k: int, budget: _OpsBudget) -> Tuple[int, list]:
+    """pmf^{*k} (메모 + 제곱 거듭제곱, 중간 결과도 메모)"""
+    key = (game_id, k)
+    cached = _POWER_MEMO.get(key)
+    if cached is not None:
+        _POWER_MEMO.move_to_end(key)
+        return cached
+
+    if k == 0:
+        return 0, [1.0]
+    if k == 1:
+        value = _trim(0, episode_pmf(game_id))
+    else:
+        # k = high + low (high = 가장 큰 2의 거듭제곱), 두 부분 모두 메모에서 재사용
+        high = 1 << (k.bit_length() - 1)
+        if high == k:
+            half_off, half = _memo_power(game_id, k // 2, budget)
+            value = _trim(2 * half_off, _convolve_resumable(("power",) + key, half, half, budget))
+        else:
+            a_off, a = _memo_power(game_id, high, budget)
+            b_off, b = _memo_power(game_id, k - high, budget)
+            value = _trim(a_off + b_off, _convolve_resumable(("power",) + key, a, b, budget))
+    _memo_put(key, value)
+    return value
+
+
+def mixture_kernel(game_id: int) -> Tuple[int, list]:
+    """추가 에피소드 혼합 커널 Σ_b C(7, b) r^b (1-r)^(7-b) · pmf^{*b} (게임별 메모)
+
+    total PMF = pmf^{*goal} * kernel 이므로 goal마다 혼합은 합성곱 1회입니다.
+
+    Returns:
+        (offset, probs): probs[i] = P(추가 에피소드 시도수 합 = offset + i)
+    """
+    kernel = _MIX_KERNELS.get(game_id)
+    if kernel is None:
+        cfg = GAME_TABLE[int(game_id)]
+        kernel = _trim(0, mix_extra_episodes([1.0], episode_pmf(game_id), cfg["CEIL_RATIO"]))
+        _MIX_KERNELS[game_id] = kernel
+    return kernel
+
+
+def _normal_mixture_pmf(game_id: int, goal: int) -> Tuple[int, list]:
+    """정규분포 혼합 근사: Σ_b w_b · N((goal+b)μ, (goal+b)σ²) 을 정수 격자에 이산화"""
+    from math import exp, pi, sqrt as _sqrt
+
+    pmf = episode_pmf(game_id)
+    mu = sum(t * p for t, p in enumerate(pmf))
+    var = sum((t - mu) ** 2 * p for t, p in enumerate(pmf))
+    r = GAME_TABLE[int(game_id)]["CEIL_RATIO"]
+
+    components = []
+    for b in range(EXTRA_EPISODES + 1):
+        w = comb(EXTRA_EPISODES, b) * r ** b * (1.0 - r) ** (EXTRA_EPISODES - b)
+        k = goal + b
+        components.append((w, k * mu, _sqrt(k * var)))
+
+    lo = max(goal, int(min(m - 8 * s for _, m, s in components)))
+    hi = int(max(m + 8 * s for _, m, s in components)) + 1
+    probs = [0.0] * (hi - lo + 1)
+    for w, m, s in components:
+        norm = w / (s * _sqrt(2 * pi))
+        for i in range(len(probs)):
+            z = (lo + i - m) / s
+            probs[i] += norm * exp(-0.5 * z * z)
+    return lo, probs
+
+
+def derive_precomputed(game_id: int, goal: int, n_sims: int = N_SIMS,
+                       max_ops: int = DERIVE_MAX_OPS) -> Tuple[List, str]:
+    """사전 계산 에셋에 없는 goal의 분포를 런타임에 유도 (isolate 메모 사용)
+
+    pmf^{*goal}은 메모된 2의 거듭제곱 합성곱으로 만들고 혼합 커널과 한 번 더 합성곱합니다.
+    순수 Python 합성곱이 이번 요청의 max_ops 안에 끝나지 않으면 진행 상태를 남기고
+    정규분포 혼합 근사로 응답합니다. 이후 요청이 남은 부분을 이어서 계산하므로
+    유한한 수의 요청 뒤에는 정확한 결과가 메모되고, 그때부터 근사 메모는 버립니다.
+
+    Args:
+        game_id: 게임 ID (1 또는 2)
+        goal: 목표 획득 수 (1 ~ DERIVE_MAX_GOAL)
+        n_sims: 빈도 합계 스케일 (에셋과 동일하게 1,000,000)
+        max_ops: 요청당 합성곱 곱셈 횟수 상한
+
+    Returns:
+        ([min_val, freq], method): method는 "exact" 또는 "normal" (근사, is_exact_method로 구분)
+
+    Raises:
+        ValueError: 알 수 없는 game_id 또는 범위를 벗어난 goal
+    """
+    cfg = GAME_TABLE.get(int(game_id))
+    if not cfg:
+        raise ValueError(f"Unknown GAME_ID: {game_id}")
+    if not 1 <= goal <= DERIVE_MAX_GOAL:
+        raise ValueError(f"goal must be between 1 and {DERIVE_MAX_GOAL}: {goal}")
+
+    game_id = int(game_id)
+    key = (game_id, goal, n_sims)
+    cached = _DERIVED_CACHE.get(key)
+    if cached is not None:
+        _DERIVED_CACHE.move_to_end(key)
+        return cached
+
+    budget = _OpsBudget(max_ops)
+    try:
+        base_off, base = _memo_power(game_id, goal, budget)
+        kernel_off, kernel = mixture_kernel(game_id)
+        probs = _convolve_resumable(("mix", game_id, goal), base, kernel, budget)
+    except _BudgetExceeded:
+        # 근사는 (game, goal)별로 메모 (요청마다 다시 계산하지 않음, HTTP/엣지 캐시에는 넣지 않음)
+        approx = _APPROX_CACHE.get(key)
+        if approx is None:
+            offset, probs = _normal_mixture_pmf(game_id, goal)
+            min_val, freq = scale_to_counts(probs, n_sims)
+            approx = ([offset + min_val, freq], "normal")
+        _lru_put(_APPROX_CACHE, key, approx, DERIVED_CACHE_MAX)
+        return approx
+
+    min_val, freq = scale_to_counts(probs, n_sims)
+    result = ([base_off + kernel_off + min_val, freq], "exact")
+    _APPROX_CACHE.pop(key, None)
+    _lru_put(_DERIVED_CACHE, key, result, DERIVED_CACHE_MAX)
+    return result
+
+
+def is_exact_method(method: str) -> bool:
+    """derive_precomputed의 method가 정확한 분포인지 (근사 결과는 HTTP/엣지 캐시 대상이 아님)"""
+    return method == "exact"
+
+
+# 혼합 커널은 GAME_TABLE로 정해지므로 import 시 계산 (메모리 스냅샷에 포함)
+for _game_id in GAME_TABLE:
+    mixture_kernel(_game_id)
@@ -2,38 +2,141 @@
 # -*- coding: utf-8 -*-
 """
 사전 계산 데이터 생성 스크립트
-goal 1~20에 대해 1,000,000 시뮬레이션 실행 후 압축 데이터 저장
+goal 1~20에 대해 분포를 계산해 압축 데이터 저장
+
+(game_id, goal) 단위 작업을 프로세스 풀로 나눠 병렬 실행합니다.
+각 작업은 직렬 실행과 같은 seed + goal 시드를 사용하므로 결과가 동일합니다.
+
+실행 (src 디렉토리에서):
+    python -m logic.generate_precomputed                 # 정확한 분포 (PMF 합성곱, 수 초)
+    python -m logic.generate_precomputed --engine mc     # 1,000,000 몬테카를로 시뮬레이션 (수 시간)
+    python -m logic.generate_precomputed --engine mc-batched  # NumPy 배치 몬테카를로 (수 분)
+    python -m logic.generate_precomputed --engine mc --workers 32 --game-id 1 --goal-range 21 31
 """
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Tuple
 
-from compute import generate_precomputed_data, save_precomputed_data
+from .compute import GAME_TABLE, N_SIMS, SEED
+from .compute_not_used import (
+    build_pity_cdf,
+    compress_totals,
+    pity_alias,
+    sample_total_draws,
+    sample_total_draws_batched,
+    save_precomputed_data,
+)
+from .exact import scale_to_counts, total_draws_pmf
 
-if __name__ == "__main__":
-    # Game ID 1에 대해 데이터 생성
-    print("=" * 60)
-    print("Generating precomputed data for GAME_ID=1")
-    print("=" * 60)
+ENGINES = ("exact", "mc", "mc-batched")
 
-    data_game1 = generate_precomputed_data(
-        game_id=1,
-        goal_range=range(1, 21),  # 1~20
-        n_sims=1_000_000
-    )
 
-    save_precomputed_data(data_game1, "precomputed_game1.json")
+def compute_unit(unit: Tuple[str, int, int, int, int]) -> Tuple[int, int, int, List[int], float]:
+    """(game_id, goal) 작업 1개 실행 (워커 프로세스에서 호출)
 
-    print("\n" + "=" * 60)
-    print("Generating precomputed data for GAME_ID=2")
-    print("=" * 60)
+    Args:
+        unit: (engine, game_id, goal, n_sims, seed)
 
-    # Game ID 2에 대해 데이터 생성
-    data_game2 = generate_precomputed_data(
-        game_id=2,
-        goal_range=range(1, 21),  # 1~20
-        n_sims=1_000_000
-    )
+    Returns:
+        (game_id, goal, min_val, freq, 소요 시간(초))
+    """
+    engine, game_id, goal, n_sims, seed = unit
+    t0 = time.perf_counter()
+
+    if engine == "exact":
+        min_val, freq = scale_to_counts(total_draws_pmf(game_id, goal), n_sims)
+    else:
+        sampler = sample_total_draws_batched if engine == "mc-batched" else sample_total_draws
+        totals = sampler(
+            n_sims=n_sims,
+            base_episodes=goal,
+            cdf=build_pity_cdf(game_id),
+            ceil_ratio=GAME_TABLE[game_id]["CEIL_RATIO"],
+            seed=seed + goal,  # generate_precomputed_data와 같은 goal별 시드
+            alias_table=pity_alias(game_id),
+        )
+        min_val, freq = compress_totals(totals)
+
+    return game_id, goal, min_val, freq, time.perf_counter() - t0
+
+
+def generate_parallel(game_ids, goal_range: range, engine: str = "exact",
+                      n_sims: int = N_SIMS, seed: int = SEED, workers: int = None) -> Dict[int, list]:
+    """(game_id, goal) 작업을 프로세스 풀로 병렬 실행
 
-    save_precomputed_data(data_game2, "precomputed_game2.json")
+    Args:
+        game_ids: 게임 ID 목록
+        goal_range: goal 범위 (예: range(1, 21))
+        engine: "exact", "mc", "mc-batched"
+        n_sims: 시뮬레이션 횟수 (exact는 빈도 합계 스케일)
+        seed: 기본 난수 시드 (goal별로 seed + goal 사용)
+        workers: 워커 프로세스 수 (None이면 CPU 수, 1이면 현재 프로세스에서 직렬 실행)
 
-    print("\n" + "=" * 60)
+    Returns:
+        {game_id: [[goal 리스트], [min1, [freq1]], ...]} (generate_precomputed_data와 같은 형식)
+    """
+    for game_id in game_ids:
+        if not GAME_TABLE.get(int(game_id)):
+            raise ValueError(f"Unknown GAME_ID: {game_id}")
+
+    units = [(engine, game_id, goal, n_sims, seed) for game_id in game_ids for goal in goal_range]
+    results: Dict[Tuple[int, int], list] = {}
+    workers = workers or os.cpu_count() or 1
+    t_start = time.perf_counter()
+
+    def report(result):
+        game_id, goal, min_val, freq, seconds = result
+        results[(game_id, goal)] = [min_val, freq]
+        print(f"  [{len(results)}/{len(units)}] game={game_id} goal={goal}: "
+              f"min={min_val}, freq_len={len(freq)} ({seconds:.2f}s)")
+
+    print(f"Running {len(units)} units (engine={engine}, n_sims={n_sims:,}, workers={workers})")
+    if workers == 1:
+        for unit in units:
+            report(compute_unit(unit))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(units))) as pool:
+            futures = [pool.submit(compute_unit, unit) for unit in units]
+            for future in as_completed(futures):
+                report(future.result())
+    print(f"All units complete in {time.perf_counter() - t_start:.2f}s")
+
+    # goal 순서대로 조립
+    return {
+        game_id: [list(goal_range)] + [results[(game_id, goal)] for goal in goal_range]
+        for game_id in game_ids
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="사전 계산 데이터 생성")
+    parser.add_argument("--engine", choices=ENGINES, default="exact",
+                        help="exact: PMF 합성곱 (잡음 없음), mc/mc-batched: 몬테카를로 시뮬레이션")
+    parser.add_argument("--n-sims", type=int, default=N_SIMS,
+                        help="시뮬레이션 횟수 (exact는 빈도 합계 스케일)")
+    parser.add_argument("--seed", type=int, default=SEED, help="기본 난수 시드 (goal별 seed + goal)")
+    parser.add_argument("--game-id", type=int, nargs="+", default=[1, 2], dest="game_ids",
+                        help="게임 ID 목록")
+    parser.add_argument("--goal-range", type=int, nargs=2, default=[1, 21], metavar=("START", "STOP"),
+                        help="goal 범위 [START, STOP)")
+    parser.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--asset-dir", default=None,
+                        help="지정하면 배포용 바이너리/goal별 샤드/manifest도 저장 (예: ../assets/data)")
+    args = parser.parse_args()
+
+    data_by_game = generate_parallel(
+        args.game_ids,
+        range(*args.goal_range),
+        engine=args.engine,
+        n_sims=args.n_sims,
+        seed=args.seed,
+        workers=args.workers,
+    )
+    for game_id, data in data_by_game.items():
+        save_precomputed_data(data, f"precomputed_game{game_id}.json", game_id=game_id, asset_dir=args.asset_dir)
+
+    print("=" * 60)
     print("All data generation complete!")
     print("=" * 60)
@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+"""
+서빙 경로용 사전 계산 데이터 로더 (Assets/KV + isolate 캐시)
+
+entry.py가 isolate 초기화 시 한 번 import합니다 (메모리 스냅샷에 포함).
+오프라인 생성/저장 유틸은 compute_not_used.py에 있습니다.
+"""
+import json
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from .compute import GAME_TABLE, split_precomputed
+from .packed import PackedReader
+
+try:
+    import brotli
+except ImportError:  # brotli가 없으면 .br 변형은 생성/사용하지 않음 (gzip만)
+    brotli = None
+
+try:
+    from workers import Request
+except ImportError:  # 로컬 도구(tools/, 데이터 생성)에서는 workers 모듈 없음
+    Request = None
+
+
+# ---------- Assets 캐시 (isolate 단위) ----------
+# 같은 isolate에서 처리되는 요청끼리 공유되는 모듈 전역 캐시
+ASSET_VERSION = "v2"          # 에셋 파일 버전 (precomputed_game{N}_{ASSET_VERSION}.json)
+ASSET_CACHE_MAX_GOALS = 64    # 캐시에 보관할 최대 (game, goal) 수 (goal당 ~40KB)
+
+# (version, game_id, goal) → [min_val, freq] (LRU 순서)
+_ASSET_CACHE: "OrderedDict[Tuple[str, int, int], List]" = OrderedDict()
+# (version, game_id) → 에셋에 포함된 goal 목록 (없는 goal 재요청 시 fetch 생략)
+_ASSET_GOALS: Dict[Tuple[str, int], frozenset] = {}
+# (version, game_id) → 바이너리 에셋 리더 (goal은 요청 시 디코딩, 게임당 ~20KB)
+_ASSET_READERS: Dict[Tuple[str, int], PackedReader] = {}
+# 바이너리 에셋이 없는 (version, game_id) (구 배포: JSON으로 바로 폴백, LRU 순서)
+_PACKED_MISSING: "OrderedDict[Tuple[str, int], bool]" = OrderedDict()
+PACKED_MISSING_MAX = 64       # 기억할 최대 (version, game_id) 수
+# version → manifest.json 내용 (None이면 manifest 없는 구 배포)
+_MANIFEST: Dict[str, Dict] = {}
+
+# 압축 변형: 이 크기(바이트) 이상인 에셋만 압축본을 받아 isolate에서 해제
+# (tools/measure_assets.py 측정: ~4KB 미만은 전송 절감보다 요청/해제 고정 비용이 큼)
+COMPRESSED_FETCH_MIN_BYTES = 4096
+
+
+MANIFEST_NAME = "manifest.json"
+
+
+def _compressed_variants() -> List[Tuple[str, str]]:
+    """사용 가능한 압축 변형 목록 [(encoding, 확장자)] (선호 순서)"""
+    variants = [("br", ".br")] if brotli is not None else []
+    return variants + [("gzip", ".gz")]
+
+
+def decompress_variant(encoding: str, data: bytes) -> bytes:
+    """압축 변형 해제
+
+    Args:
+        encoding: "br" 또는 "gzip"
+        data: 압축된 바이트열
+
+    Returns:
+        원본 바이트열
+    """
+    if encoding == "br":
+        return brotli.decompress(data)
+    if encoding == "gzip":
+        return zlib.decompress(data, 31)  # wbits=31: gzip 헤더
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def invalidate_precomputed_cache(game_id: int = None) -> int:
+    """Assets 캐시 무효화 (에셋 버전 변경/재배포 시 호출)
+
+    Args:
+        game_id: 무효화할 게임 ID (None이면 전체)
+
+    Returns:
+        제거된 goal 엔트리 수
+    """
+    if game_id is None:
+        removed = len(_ASSET_CACHE)
+        _ASSET_CACHE.clear()
+        _ASSET_GOALS.clear()
+        _ASSET_READERS.clear()
+        _PACKED_MISSING.clear()
+        _MANIFEST.clear()
+        return removed
+
+    keys = [k for k in _ASSET_CACHE if k[1] == game_id]
+    for k in keys:
+        del _ASSET_CACHE[k]
+    for k in [k for k in _ASSET_GOALS if k[1] == game_id]:
+        del _ASSET_GOALS[k]
+    for k in [k for k in _ASSET_READERS if k[1] == game_id]:
+        del _ASSET_READERS[k]
+    for k in [k for k in _PACKED_MISSING if k[1] == game_id]:
+        del _PACKED_MISSING[k]
+    return len(keys)
+
+
+def _cache_entry(cache_key, entry) -> None:
+    """goal 엔트리 1개를 캐시에 저장 (LRU 상한 유지)"""
+    _ASSET_CACHE[cache_key] = entry
+    _ASSET_CACHE.move_to_end(cache_key)
+    while len(_ASSET_CACHE) > ASSET_CACHE_MAX_GOALS:
+        _ASSET_CACHE.popitem(last=False)
+
+
+def _cache_precomputed(game_id: int, full_data) -> None:
+    """파싱된 전체 에셋을 goal별 엔트리로 쪼개 캐시에 저장 (LRU 상한 유지)"""
+    keys = full_data[0]
+    _ASSET_GOALS[(ASSET_VERSION, game_id)] = frozenset(keys)
+    for index, goal in enumerate(keys, start=1):
+        min_val, freq = split_precomputed(full_data[index])
+        _cache_entry((ASSET_VERSION, game_id, goal), [min_val, freq])
+
+
+async def _response_bytes(response) -> bytes:
+    """fetch 응답 본문을 bytes로 읽기 (Python Response 래퍼 / JS Response 모두 지원)"""
+    if hasattr(response, "bytes"):
+        return await response.bytes()
+    buffer = await response.arrayBuffer()
+    return buffer.to_bytes()
+
+
+async def _load_manifest(assets_binding):
+    """manifest.json 로드 (isolate 캐시, 없는 구 배포면 None)"""
+    if ASSET_VERSION in _MANIFEST:
+        return _MANIFEST[ASSET_VERSION]
+
+    response = await assets_binding.fetch(Request(f"https://dummy/data/{MANIFEST_NAME}", method="GET"))
+    manifest = await response.json() if response.status == 200 else None
+    _MANIFEST[ASSET_VERSION] = manifest
+    if manifest:
+        for game_key, entry in manifest.get("games", {}).items():
+            _ASSET_GOALS[(ASSET_VERSION, int(game_key))] = frozenset(entry["goals"])
+    return manifest
+
+
+async def data_version(assets_binding) -> str:
+    """배포된 데이터 버전 (manifest의 "version", manifest가 없는 구 배포면 ASSET_VERSION)
+
+    ETag/캐시 키에 넣어 데이터가 재생성되면 이전 응답이 재사용되지 않게 합니다.
+    """
+    try:
+        manifest = await _load_manifest(assets_binding)
+    except Exception as e:
+        print(f"Error loading manifest: {e}")
+        manifest = None
+    if manifest and manifest.get("version"):
+        return manifest["version"]
+    return ASSET_VERSION
+
+
+async def _fetch_data_asset(assets_binding, name: str):
+    """data/ 아래 에셋 바이트열 가져오기 (manifest에 압축 변형이 있으면 압축본 + isolate 내 해제)
+
+    Args:
+        assets_binding: Cloudflare Assets 바인딩 객체
+        name: data/ 기준 상대 경로 (예: "game1/5.bin")
+
+    Returns:
+        원본 바이트열 또는 없으면 None
+    """
+    asset_path = f"https://dummy/data/{name}"
+    manifest = _MANIFEST.get(ASSET_VERSION)
+    info = manifest.get("files", {}).get(name) if manifest else None
+    if info and info["bytes"] >= COMPRESSED_FETCH_MIN_BYTES:
+        for encoding, suffix in _compressed_variants():
+            if encoding in info["encodings"]:
+                response = await assets_binding.fetch(Request(asset_path + suffix, method="GET"))
+                if response.status == 200:
+                    return decompress_variant(encoding, await _response_bytes(response))
+                break
+
+    response = await assets_binding.fetch(Request(asset_path, method="GET"))
+    if response.status != 200:
+        return None
+    return await _response_bytes(response)
+
+
+async def _load_shard(assets_binding, entry: Dict, goal: int):
+    """goal 1개짜리 샤드 로드 (없으면 None)"""
+    payload = await _fetch_data_asset(assets_binding, entry["shards"].format(goal=goal))
+    if payload is None:
+        return None
+    return PackedReader(payload).read(goal)
+
+
+async def _load_packed_reader(assets_binding, game_id: int):
+    """바이너리 에셋 리더 로드 (isolate 캐시, 없으면 None)"""
+    reader_key = (ASSET_VERSION, game_id)
+    reader = _ASSET_READERS.get(reader_key)
+    if reader is not None or reader_key in _PACKED_MISSING:
+        return reader
+
+    payload = await _fetch_data_asset(assets_binding, f"precomputed_game{game_id}.bin")
+    if payload is None:
+        _PACKED_MISSING[reader_key] = True
+        while len(_PACKED_MISSING) > PACKED_MISSING_MAX:
+            _PACKED_MISSING.popitem(last=False)
+        return None
+
+    reader = PackedReader(payload)
+    _ASSET_READERS[reader_key] = reader
+    _ASSET_GOALS[reader_key] = frozenset(reader.goals)
+    return reader
+
+
+async def load_precomputed_from_assets(assets_binding, game_id: int, goal: int):
+    """Assets에서 사전 계산된 압축 데이터 불러오기 (isolate 캐시 사용)
+
+    manifest.json이 있으면 요청된 goal의 샤드(game{N}/{goal}.bin, ~1KB)만 받고,
+    없는 구 배포에서는 게임 전체 바이너리(precomputed_game{N}.bin) → JSON 순으로 폴백합니다.
+    이후 같은 isolate의 요청은 ASSETS 왕복과 파싱 없이 캐시에서 반환합니다.
+
+    Args:
+        assets_binding: Cloudflare Assets 바인딩 객체
+        game_id: 게임 ID (1 또는 2)
+        goal: 목표 획득 수
+
+    Returns:
+        압축된 시뮬레이션 데이터 [min_val, freq_list] 또는 None
+    """
+    cached = cached_precomputed(game_id, goal)
+    if cached is not None:
+        return cached
+    return await fetch_precomputed_from_assets(assets_binding, game_id, goal)
+
+
+def cached_precomputed(game_id: int, goal: int):
+    """isolate 메모리 캐시 조회만 (ASSETS 접근 없음, 없으면 None)"""
+    cache_key = (ASSET_VERSION, game_id, goal)
+    cached = _ASSET_CACHE.get(cache_key)
+    if cached is not None:
+        _ASSET_CACHE.move_to_end(cache_key)
+    return cached
+
+
+def store_precomputed(game_id: int, goal: int, entry) -> None:
+    """다른 계층(Cache API/KV)에서 가져온 엔트리를 isolate 메모리 캐시에 저장"""
+    _cache_entry((ASSET_VERSION, game_id, goal), entry)
+
+
+async def fetch_precomputed_from_assets(assets_binding, game_id: int, goal: int):
+    """메모리 캐시를 건너뛰고 Assets에서 로드 (결과는 메모리 캐시에 저장)
+
+    Args:
+        assets_binding: Cloudflare Assets 바인딩 객체
+        game_id: 게임 ID (1 또는 2)
+        goal: 목표 획득 수
+
+    Returns:
+        압축된 시뮬레이션 데이터 [min_val, freq_list] 또는 None (GAME_TABLE에 없는 게임은 fetch 없이 None)
+    """
+    if game_id not in GAME_TABLE:
+        return None
+    cache_key = (ASSET_VERSION, game_id, goal)
+
+    # 이미 읽은 게임에 없는 goal이면 다시 받지 않음
+    known_goals = _ASSET_GOALS.get((ASSET_VERSION, game_id))
+    if known_goals is not None and goal not in known_goals:
+        return None
+
+    # 정적 파일 경로
+    asset_name = f"precomputed_game{game_id}_{ASSET_VERSION}.json"
+
+    try:
+        # 이미 받은 게임 전체 바이너리가 있으면 추가 fetch 없이 디코딩
+        reader = _ASSET_READERS.get((ASSET_VERSION, game_id))
+        if reader is not None:
+            entry = reader.read(goal)
+            if entry is not None:
+                _cache_entry(cache_key, entry)
+            return entry
+
+        # goal별 샤드 우선 (manifest에 있는 게임만)
+        manifest = await _load_manifest(assets_binding)
+        game_entry = manifest.get("games", {}).get(str(game_id)) if manifest else None
+        if game_entry is not None:
+            if goal not in game_entry["goals"]:
+                return None
+            entry = await _load_shard(assets_binding, game_entry, goal)
+            if entry is not None:
+                _cache_entry(cache_key, entry)
+                return entry
+
+        # 게임 전체 바이너리 에셋 (~20KB, goal 1개 디코딩 ~0.3ms)
+        reader = await _load_packed_reader(assets_binding, game_id)
+        if reader is not None:
+            entry = reader.read(goal)
+            if entry is not None:
+                _cache_entry(cache_key, entry)
+            return entry
+
+        # Assets에서 JSON 파일 가져오기 (~1-3ms, 캐시 미스 시에만)
+        payload = await _fetch_data_asset(assets_binding, asset_name)
+        if payload is None:
+            print(f"Asset not found: {asset_name}")
+            return None
+
+        # JSON 파싱 후 goal별로 캐시
+        full_data = json.loads(payload)
+        _cache_precomputed(game_id, full_data)
+
+        return _ASSET_CACHE.get(cache_key)  # [min_val, freq_list] 또는 None
+    except Exception as e:
+        print(f"Error loading from assets (game{game_id}_{goal}): {e}")
+        return None
+
+
+async def load_precomputed_from_kv(kv_store, game_id: int, goal: int):
+    """KV에서 사전 계산된 압축 데이터 불러오기 (폴백)
+
+    Args:
+        kv_store: Cloudflare KV 스토어 객체
+        game_id: 게임 ID (1 또는 2)
+        goal: 목표 획득 수
+
+    Returns:
+        압축된 시뮬레이션 데이터 [min_val, freq_list] 또는 None
+    """
+    kv_key = f"game{game_id}_{goal}"
+
+    try:
+        data_str = await kv_store.get(kv_key)
+        if data_str:
+            return json.loads(data_str)
+        return None
+    except Exception as e:
+        print(f"Error loading from KV ({kv_key}): {e}")
+        return None
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+요청 카운트 집계 (isolate 메모리 + KV 주기적 반영)
+
+매 요청마다 KV get/put을 하지 않고 isolate 메모리에서 센 뒤,
+일정 요청 수 또는 일정 시간이 지나면 누적된 증가분만 KV "count" 키에 더합니다.
+"""
+import os
+import time
+from typing import Dict
+
+METRICS_KV_KEY = "count"    # KV 누적 요청 수 키 (기존 키 유지)
+FLUSH_EVERY_N = 100         # 증가분이 이만큼 쌓이면 KV 반영
+FLUSH_INTERVAL_S = 60.0     # 마지막 반영 후 이 시간이 지나면 KV 반영
+# 경로별 집계 키로 쓰는 API 경로/메서드 (그 외 경로는 "static"/"other"로 묶어 키 수를 고정)
+API_PATHS = ("/api/health", "/api/stats", "/api/simulate", "/api/simulate/batch", "/api/quantiles", "/api/plan")
+ROUTE_METHODS = ("GET", "POST", "OPTIONS")
+
+# isolate 식별자 (요청 ID 접두사). 메모리 스냅샷은 import 시점 상태를 모든 isolate가 공유하므로
+# import 때가 아니라 첫 요청에서 생성합니다 (isolate_id()).
+_isolate_id = None
+
+_seq = 0                          # isolate 내 요청 일련번호
+_pending = 0                      # 아직 KV에 반영하지 않은 증가분
+_by_route: Dict[str, int] = {}    # route_key() → isolate 내 요청 수
+_last_flush = time.monotonic()
+_flushing = False
+
+# 콜드 스타트 측정: isolate의 첫 요청 vs 이후 요청 처리 시간 (fetch 벽시계 기준)
+# 모듈 import는 배포 시 메모리 스냅샷 생성 때 실행되어 isolate에서는 측정할 수 없으므로
+# tools/measure_startup.py로 로컬에서 측정합니다.
+_startup: Dict = {
+    "first_request_ms": None,    # isolate의 첫 요청 처리 시간
+    "first_request_path": None,
+    "warm_requests": 0,          # 첫 요청 이후 처리된 요청 수
+    "warm_avg_ms": None,         # 첫 요청 이후 평균 처리 시간
+}
+_warm_total_ms = 0.0
+
+
+def route_key(method: str, path: str) -> str:
+    """집계용 경로 키 (알려진 API 경로만 "METHOD path", 나머지는 "static" / "other")
+
+    임의 경로 요청이 isolate 메모리와 /api/stats 응답을 키우지 않도록 키 집합을 고정합니다.
+
+    Args:
+        method: HTTP 메서드
+        path: 요청 경로
+
+    Returns:
+        예: "POST /api/simulate", "static" (ASSETS로 넘기는 경로), "other" (모르는 /api/ 경로 또는 메서드)
+    """
+    if not path.startswith("/api/"):
+        return "static"
+    if path in API_PATHS and method in ROUTE_METHODS:
+        return f"{method} {path}"
+    return "other"
+
+
+def record_request(method: str, path: str) -> str:
+    """요청 1건 집계 후 로그용 요청 ID 반환 (KV 접근 없음)
+
+    Args:
+        method: HTTP 메서드
+        path: 요청 경로
+
+    Returns:
+        요청 ID (예: "3fa2c1-17")
+    """
+    global _seq, _pending
+    _seq += 1
+    _pending += 1
+    route = route_key(method, path)
+    _by_route[route] = _by_route.get(route, 0) + 1
+    return f"{isolate_id()}-{_seq}"
+
+
+def isolate_id() -> str:
+    """isolate 식별자 (첫 호출 시 생성, 예: "3fa2c1")"""
+    global _isolate_id
+    if _isolate_id is None:
+        _isolate_id = os.urandom(3).hex()
+    return _isolate_id
+
+
+def flush_due() -> bool:
+    """KV 반영 시점인지 확인 (증가분 FLUSH_EVERY_N 이상 또는 FLUSH_INTERVAL_S 경과)"""
+    if _flushing or _pending == 0:
+        return False
+    return _pending >= FLUSH_EVERY_N or (time.monotonic() - _last_flush) >= FLUSH_INTERVAL_S
+
+
+async def flush(store) -> int:
+    """누적 증가분을 KV 카운터에 더함 (백그라운드 실행용)
+
+    증가분은 await 전에 떼어내므로 반영 중 들어온 요청은 다음 반영에 포함됩니다.
+    KV 쓰기가 실패하면 증가분을 되돌려 다음 반영 때 다시 시도합니다.
+
+    Args:
+        store: Cloudflare KV 스토어 객체 (GLOBAL_STORE)
+
+    Returns:
+        반영 후 KV 카운터 값 (실패 시 -1)
+    """
+    global _pending, _last_flush, _flushing
+    if _flushing or _pending == 0:
+        return -1
+    delta, _pending = _pending, 0
+    _flushing = True
+    try:
+        count = int(await store.get(METRICS_KV_KEY) or "0") + delta
+        await store.put(METRICS_KV_KEY, str(count))
+        _last_flush = time.monotonic()
+        return count
+    except Exception as e:
+        _pending += delta
+        print(f"[metrics] flush failed: {e}")
+        return -1
+    finally:
+        _flushing = False
+
+
+def record_request_time(path: str, elapsed_ms: float) -> None:
+    """요청 처리 시간 기록 (첫 요청은 별도 보관, 이후는 warm 평균)
+
+    Args:
+        path: 요청 경로
+        elapsed_ms: fetch 처리 시간 (ms)
+    """
+    global _warm_total_ms
+    if _startup["first_request_ms"] is None:
+        _startup["first_request_ms"] = elapsed_ms
+        _startup["first_request_path"] = path
+        return
+    _warm_total_ms += elapsed_ms
+    _startup["warm_requests"] += 1
+    _startup["warm_avg_ms"] = _warm_total_ms / _startup["warm_requests"]
+
+
+def startup_snapshot() -> Dict:
+    """콜드 스타트 측정 현황"""
+    return dict(_startup)
+
+
+def snapshot() -> Dict:
+    """isolate 내 집계 현황"""
+    return {
+        "isolate": isolate_id(),
+        "requests": _seq,
+        "pending_flush": _pending,
+        "by_route": dict(_by_route),
+        "startup": startup_snapshot(),
+    }
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+사전 계산 데이터의 바이너리 형식 (precomputed_game{N}.bin)
+
+JSON 대신 작은 헤더 + goal별 인덱스 + delta/zigzag varint 빈도로 저장합니다.
+읽는 쪽은 memoryview 위에서 헤더만 해석하고, 요청된 goal의 구간만 디코딩합니다.
+
+레이아웃 (리틀 엔디언):
+    header   : magic "PCD1" | u16 version | u16 n_goals
+    index    : n_goals × (u16 goal | i32 min_val | u32 length | u32 offset | u32 nbytes)
+    payload  : goal별 varint 스트림 (offset은 파일 시작 기준 바이트 위치)
+
+빈도 인코딩: d[i] = freq[i] - freq[i-1] (freq[-1] = 0) → zigzag → LEB128 varint
+"""
+import struct
+from typing import Dict, List, Tuple
+
+from .compute import split_precomputed
+
+MAGIC = b"PCD1"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHH")
+_ENTRY = struct.Struct("<HiIII")
+
+
+# ---------- 인코딩 (사전 계산 도구용) ----------
+def _encode_counts(freq: List[int]) -> bytes:
+    """빈도 리스트 → delta/zigzag varint 바이트열"""
+    out = bytearray()
+    prev = 0
+    for count in freq:
+        delta = count - prev
+        prev = count
+        z = (delta << 1) if delta >= 0 else ((-delta << 1) - 1)
+        while z >= 0x80:
+            out.append((z & 0x7F) | 0x80)
+            z >>= 7
+        out.append(z)
+    return bytes(out)
+
+
+def pack_precomputed(data) -> bytes:
+    """[goal 리스트, 엔트리...] 데이터를 바이너리 형식으로 변환
+
+    Args:
+        data: generate_precomputed_data 결과 또는 v2 형식 (엔트리는 [min_val, freq] 또는 freq)
+
+    Returns:
+        바이너리 형식 바이트열
+    """
+    goals = data[0]
+    entries = [split_precomputed(data[i]) for i in range(1, len(goals) + 1)]
+    payloads = [_encode_counts(freq) for _, freq in entries]
+
+    offset = _HEADER.size + _ENTRY.size * len(goals)
+    index = bytearray()
+    for goal, (min_val, freq), payload in zip(goals, entries, payloads):
+        index += _ENTRY.pack(goal, min_val, len(freq), offset, len(payload))
+        offset += len(payload)
+
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, len(goals)) + bytes(index) + b"".join(payloads)
+
+
+# ---------- 디코딩 (Worker용) ----------
+class PackedReader:
+    """바이너리 형식 리더 (헤더만 해석, goal 데이터는 요청 시 디코딩)
+
+    Args:
+        buffer: 바이너리 형식 바이트열 (bytes, bytearray, memoryview)
+
+    Raises:
+        ValueError: 형식이 맞지 않는 경우
+    """
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer)
+        magic, version, n_goals = _HEADER.unpack_from(self._view, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported precomputed format: {bytes(magic)!r} v{version}")
+
+        # goal → (min_val, length, offset, nbytes)
+        self.index: Dict[int, Tuple[int, int, int, int]] = {}
+        for i in range(n_goals):
+            goal, min_val, length, offset, nbytes = _ENTRY.unpack_from(self._view, _HEADER.size + i * _ENTRY.size)
+            self.index[goal] = (min_val, length, offset, nbytes)
+
+    @property
+    def goals(self) -> List[int]:
+        """포함된 goal 목록"""
+        return list(self.index)
+
+    def read(self, goal: int):
+        """goal 하나의 데이터 디코딩
+
+        Args:
+            goal: 목표 획득 수
+
+        Returns:
+            [min_val, freq] 또는 goal이 없으면 None
+        """
+        entry = self.index.get(goal)
+        if entry is None:
+            return None
+        min_val, length, offset, nbytes = entry
+
+        freq = [0] * length
+        prev = 0
+        z = 0
+        shift = 0
+        i = 0
+        for byte in self._view[offset:offset + nbytes]:
+            z |= (byte & 0x7F) << shift
+            if byte & 0x80:
+                shift += 7
+                continue
+            prev += (z >> 1) if not (z & 1) else -((z + 1) >> 1)
+            freq[i] = prev
+            i += 1
+            z = 0
+            shift = 0
+        if i != length:
+            raise ValueError(f"Corrupted payload for goal={goal}: {i} of {length} counts")
+        return [min_val, freq]
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+요청 단위 span 트레이싱 (Server-Timing 헤더 + isolate 단위 롤링 분포)
+
+요청마다 begin()으로 트레이스를 열고, 처리 중에는 `with span("load"):`처럼 구간을 잽니다.
+span은 중첩되며 이름은 "compute.summarize"처럼 부모 이름을 앞에 붙입니다.
+end()에서 span별 소요 시간을 isolate 전역 롤링 윈도우에 넣고, header()로 Server-Timing 값을 만듭니다.
+
+트레이스가 열려 있지 않으면(비활성화 포함) span()은 공유 no-op 객체를 반환하므로
+서빙 코드에 남아 있어도 비용은 ContextVar 조회 1회 수준입니다.
+
+enable_memory_profiling()을 켜면(opt-in) tracemalloc으로 span마다 피크/잔존 메모리도 기록합니다.
+    피크 = span 동안 할당량 최대치 - 시작 시점 할당량
+    잔존 = span 종료 시점 할당량 - 시작 시점 할당량 (캐시에 남은 양 포함)
+tracemalloc 수치는 프로세스 전역이므로 동시 요청이 없을 때(순차 실행) 측정해야 정확합니다.
+"""
+import time
+import tracemalloc
+from collections import deque
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+HISTOGRAM_WINDOW = 1024   # span별 보관할 최근 소요 시간 수 (롤링 p50/p95/p99)
+MAX_SPANS = 32            # 요청당 기록할 최대 span 수 (Server-Timing 헤더 길이 제한)
+MAX_HISTOGRAMS = 128      # isolate에 보관할 최대 span 이름 수
+MAX_ROUTE_HISTOGRAMS = 32  # isolate에 보관할 최대 route 수 (span 이름과 별도 상한)
+
+# span 이름 → 최근 소요 시간(ms) (isolate 전역)
+_HISTOGRAMS: Dict[str, deque] = {}
+# route → 요청 전체 소요 시간(ms) (route가 span 자리를 차지하지 않도록 따로 보관)
+_ROUTE_HISTOGRAMS: Dict[str, deque] = {}
+# 현재 요청의 트레이스 (동시 요청끼리 섞이지 않도록 ContextVar)
+_CURRENT: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+# 현재 열려 있는 span (asyncio.gather 등으로 나뉜 태스크마다 따로 중첩)
+_PARENT: ContextVar[Optional["_Span"]] = ContextVar("span", default=None)
+
+# 메모리 프로파일링 (opt-in, tracemalloc 오버헤드가 커서 기본 비활성화)
+_MEMORY = False
+# span 이름 → {"count", "peak_kb_max", "peak_kb_avg", "retained_kb_max", "retained_kb_avg"} 누적
+_MEMORY_STATS: Dict[str, Dict] = {}
+
+
+class _NoopSpan:
+    """트레이스가 없을 때 쓰는 공유 no-op span"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def _memory_enter(scope) -> None:
+    """scope(span 또는 트레이스)의 메모리 측정 시작
+
+    tracemalloc 피크는 전역 하나이므로, 초기화 전에 지금까지의 피크를 바깥 scope에 넘겨둡니다.
+    """
+    current, peak = tracemalloc.get_traced_memory()
+    parent = scope.parent
+    if parent is not None and parent.mem0 is not None:
+        parent.peak = max(parent.peak, peak)
+    tracemalloc.reset_peak()
+    scope.mem0 = scope.peak = current
+
+
+def _memory_exit(scope) -> tuple:
+    """scope의 (피크 KB, 잔존 KB), 피크는 바깥 scope에도 반영"""
+    current, peak = tracemalloc.get_traced_memory()
+    peak = max(scope.peak, peak)
+    parent = scope.parent
+    if parent is not None and parent.mem0 is not None:
+        parent.peak = max(parent.peak, peak)
+    return (peak - scope.mem0) / 1024, (current - scope.mem0) / 1024
+
+
+class _Span:
+    __slots__ = ("trace", "name", "t0", "token", "parent", "mem0", "peak")
+
+    def __init__(self, trace: "Trace", name: str):
+        self.trace = trace
+        self.name = name
+        self.mem0 = None
+
+    def __enter__(self):
+        parent = _PARENT.get()
+        if parent is not None and parent.trace is self.trace:
+            self.name = f"{parent.name}.{self.name}"
+            self.parent = parent
+        else:
+            self.parent = self.trace
+        self.token = _PARENT.set(self)
+        if _MEMORY and self.trace.mem0 is not None:
+            _memory_enter(self)
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed_ms = (time.perf_counter() - self.t0) * 1000
+        _PARENT.reset(self.token)
+        if self.mem0 is not None:
+            self.trace.memory.append((self.name, *_memory_exit(self)))
+        if len(self.trace.spans) < MAX_SPANS:
+            self.trace.spans.append((self.name, elapsed_ms))
+        return False
+
+
+class Trace:
+    """요청 1건의 span 기록"""
+    __slots__ = ("spans", "t0", "token", "memory", "parent", "mem0", "peak")
+
+    def __init__(self):
+        self.spans: List[tuple] = []   # (이름, ms) 종료 순서
+        self.memory: List[tuple] = []  # (이름, 피크 KB, 잔존 KB) 메모리 프로파일링 시에만
+        self.t0 = time.perf_counter()
+        self.token = None
+        self.parent = None
+        self.mem0 = None
+        if _MEMORY:
+            _memory_enter(self)
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.t0) * 1000
+
+    def header(self) -> str:
+        """Server-Timing 헤더 값 (예: "load;dur=1.20, compute;dur=0.35, total;dur=1.90")"""
+        entries = [f"{name};dur={ms:.2f}" for name, ms in self.spans]
+        entries.append(f"total;dur={self.total_ms():.2f}")
+        return ", ".join(entries)
+
+
+def begin() -> Trace:
+    """현재 요청의 트레이스 시작"""
+    trace = Trace()
+    trace.token = _CURRENT.set(trace)
+    return trace
+
+
+def end(trace: Optional[Trace], route: str = None) -> None:
+    """트레이스 종료: span별 소요 시간을 롤링 윈도우에 기록
+
+    Args:
+        trace: begin() 결과 (None이면 무시)
+        route: 지정하면 전체 소요 시간을 이 이름으로도 기록 (예: "POST /api/simulate")
+               원시 경로가 아니라 metrics.route_key()처럼 고정된 키를 넘깁니다.
+    """
+    if trace is None:
+        return
+    if trace.token is not None:
+        _CURRENT.reset(trace.token)
+        trace.token = None
+    if trace.mem0 is not None:
+        memory = list(trace.memory)
+        if route is not None:
+            memory.append((route, *_memory_exit(trace)))
+        _record_memory(memory)
+    for name, ms in trace.spans:
+        _record(_HISTOGRAMS, MAX_HISTOGRAMS, name, ms)
+    if route is not None:
+        _record(_ROUTE_HISTOGRAMS, MAX_ROUTE_HISTOGRAMS, route, trace.total_ms())
+
+
+def _record(histograms: Dict[str, deque], max_names: int, name: str, ms: float) -> None:
+    window = histograms.get(name)
+    if window is None:
+        if len(histograms) >= max_names:
+            return
+        window = histograms[name] = deque(maxlen=HISTOGRAM_WINDOW)
+    window.append(ms)
+
+
+def span(name: str):
+    """현재 트레이스에 span 열기 (트레이스가 없으면 no-op)
+
+    사용법:
+        with tracing.span("summarize"):
+            ...
+    """
+    trace = _CURRENT.get()
+    if trace is None:
+        return _NOOP
+    return _Span(trace, name)
+
+
+def _percentile(sorted_ms: List[float], p: float) -> float:
+    """정렬된 목록의 nearest-rank 분위수"""
+    rank = max(1, -(-len(sorted_ms) * p // 100))
+    return sorted_ms[int(rank) - 1]
+
+
+def stats() -> Dict:
+    """span/route별 롤링 분포 {이름: {count, p50_ms, p95_ms, p99_ms, max_ms}} (최근 HISTOGRAM_WINDOW개 기준)"""
+    out = {}
+    for name, window in sorted({**_HISTOGRAMS, **_ROUTE_HISTOGRAMS}.items()):
+        values = sorted(window)
+        out[name] = {
+            "count": len(values),
+            "p50_ms": round(_percentile(values, 50), 3),
+            "p95_ms": round(_percentile(values, 95), 3),
+            "p99_ms": round(_percentile(values, 99), 3),
+            "max_ms": round(values[-1], 3),
+        }
+    return out
+
+
+def reset() -> None:
+    """롤링 분포 / 메모리 누적 초기화"""
+    _HISTOGRAMS.clear()
+    _ROUTE_HISTOGRAMS.clear()
+    _MEMORY_STATS.clear()
+
+
+# ---------- 메모리 프로파일링 (opt-in) ----------
+def enable_memory_profiling(enabled: bool = True) -> None:
+    """tracemalloc 기반 span별 메모리 측정 켜기/끄기 (켜는 동안 할당마다 오버헤드가 있음)"""
+    global _MEMORY
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _MEMORY = enabled
+
+
+def memory_profiling_enabled() -> bool:
+    return _MEMORY
+
+
+def _record_memory(samples: List[tuple]) -> None:
+    for name, peak_kb, retained_kb in samples:
+        entry = _MEMORY_STATS.get(name)
+        if entry is None:
+            if len(_MEMORY_STATS) >= MAX_HISTOGRAMS:
+                continue
+            entry = _MEMORY_STATS[name] = {"count": 0, "peak_kb_max": 0.0, "peak_kb_sum": 0.0,
+                                           "retained_kb_max": 0.0, "retained_kb_sum": 0.0}
+        entry["count"] += 1
+        entry["peak_kb_max"] = max(entry["peak_kb_max"], peak_kb)
+        entry["peak_kb_sum"] += peak_kb
+        entry["retained_kb_max"] = max(entry["retained_kb_max"], retained_kb)
+        entry["retained_kb_sum"] += retained_kb
+
+
+def memory_stats() -> Dict:
+    """span별 메모리 {이름: {count, peak_kb_max, peak_kb_avg, retained_kb_max, retained_kb_avg}} (프로파일링 켠 뒤 누적)"""
+    out = {}
+    for name, entry in sorted(_MEMORY_STATS.items()):
+        count = entry["count"]
+        out[name] = {
+            "count": count,
+            "peak_kb_max": round(entry["peak_kb_max"], 1),
+            "peak_kb_avg": round(entry["peak_kb_sum"] / count, 1),
+            "retained_kb_max": round(entry["retained_kb_max"], 1),
+            "retained_kb_avg": round(entry["retained_kb_sum"] / count, 1),
+        }
+    return out
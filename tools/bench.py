@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+연산 경로 마이크로 벤치마크 (기준선 비교 + 회귀 임계값)
+
+커밋된 에셋(assets/data/game{N}/{goal}.bin)으로 goal 1~20, 게임 1/2에 대해
+  - decompress_totals / summarize / make_hist_svg (빈도 리스트 → 100만 샘플 복원 경로)
+  - run_simulation (서빙 경로: cold = 인덱스/SVG 템플릿 캐시 비운 상태, warm = 캐시 적중)
+그리고 게임별로
+  - build_pity_cdf (cold = 메모 비운 상태, warm = 메모 적중)
+  - sample_total_draws (--n-sims, 기본 goal 10)
+의 최솟값(ms, --repeat회 중)을 측정해 JSON으로 저장하고, 기준선과 비교해 --threshold(%) 이상이면서
+MIN_DELTA_MS 이상 느려진 항목이 있으면 종료 코드 1로 실패합니다.
+최솟값은 스케줄링/GC 잡음이 더해지지 않은 값이라 중앙값보다 실행 간 편차가 작습니다.
+기준선은 측정한 머신에서만 의미가 있으므로 머신을 바꾸면 --save-baseline으로 다시 만드세요.
+
+실행 (저장소 루트에서):
+    python tools/bench.py                              # 측정 + tools/bench_baseline.json과 비교
+    python tools/bench.py --quick                      # goal 1, 10, 20만
+    python tools/bench.py --save-baseline              # 현재 결과를 기준선으로 저장
+    python tools/bench.py --output bench.json --threshold 15 --n-sims 50000
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from logic import compute  # noqa: E402
+from logic.compute import (  # noqa: E402
+    GAME_TABLE,
+    build_pity_cdf,
+    decompress_totals,
+    hist_bins,
+    make_hist_svg,
+    run_simulation,
+    summarize,
+)
+from logic.compute_not_used import sample_total_draws  # noqa: E402
+from logic.packed import PackedReader  # noqa: E402
+
+ASSET_DIR = os.path.join(ROOT, "assets", "data")
+BASELINE_PATH = os.path.join(ROOT, "tools", "bench_baseline.json")
+DEFAULT_THRESHOLD_PCT = 35.0   # 기준선 대비 이 비율(%) 이상 느려지면 회귀 (공유 vCPU에서 실행 간 편차 ~±25%)
+NOISE_FLOOR_MS = 0.05          # 기준선/현재 모두 이 값 미만이면 비교 제외 (타이머 잡음)
+MIN_DELTA_MS = 0.5             # 비율과 함께 이 값(ms) 이상 느려져야 회귀 (~1ms 이하 항목의 지터 흡수)
+DEFAULT_REPEAT = 10            # 측정 반복 횟수 (최솟값 사용)
+SAMPLE_GOAL = 10               # sample_total_draws 측정 goal
+
+
+def _min_ms(fn, repeat: int, setup=None) -> float:
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        # timeit과 같이 측정 중 GC 비활성화 (이전 측정의 쓰레기 수거 시점에 따른 편차 제거)
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - t0) * 1000)
+        finally:
+            gc.enable()
+    return min(samples)
+
+
+def _load_shard(game_id: int, goal: int):
+    with open(os.path.join(ASSET_DIR, f"game{game_id}", f"{goal}.bin"), 'rb') as f:
+        return PackedReader(f.read()).read(goal)
+
+
+def _clear_serving_caches() -> None:
+    compute._FREQ_INDEX_CACHE.clear()
+
+
+def run_benchmarks(game_ids, goals, repeat: int, n_sims: int) -> dict:
+    """벤치마크 실행 → {이름: 최솟값 ms}"""
+    results = {}
+    for game_id in game_ids:
+        # pity CDF: cold는 파라미터별 메모를 비우고 측정
+        results[f"build_pity_cdf/game{game_id}/cold"] = _min_ms(
+            lambda: build_pity_cdf(game_id), repeat * 10, setup=compute._PITY_TABLES.clear)
+        results[f"build_pity_cdf/game{game_id}/warm"] = _min_ms(lambda: build_pity_cdf(game_id), repeat * 10)
+
+        cdf, ceil_ratio = build_pity_cdf(game_id), GAME_TABLE[game_id]["CEIL_RATIO"]
+        alias_table = compute.pity_alias(game_id)
+        results[f"sample_total_draws/game{game_id}/n{n_sims}"] = _min_ms(
+            lambda: sample_total_draws(n_sims, SAMPLE_GOAL, cdf, ceil_ratio, seed=1, alias_table=alias_table), repeat)
+
+        for goal in goals:
+            entry = _load_shard(game_id, goal)
+            obs_total = compute.quantile(compute.build_freq_index(*entry), 0.5)
+            totals = decompress_totals(*entry)
+            key = f"game{game_id}/goal{goal}"
+
+            results[f"decompress_totals/{key}"] = _min_ms(lambda: decompress_totals(*entry), repeat)
+            # totals는 기본 인자로 묶어 둠 (아래 del 뒤에도 람다가 이름을 참조하지 않도록)
+            results[f"summarize/{key}"] = _min_ms(
+                lambda totals=totals: summarize(totals, obs_total, len(totals)), repeat)
+            results[f"make_hist_svg/{key}"] = _min_ms(
+                lambda totals=totals: make_hist_svg(totals, obs_total, bins=hist_bins(goal), title="bench"), repeat)
+            del totals  # 서빙 경로 측정 전에 100만 개 리스트 해제
+
+            # 서빙 경로 (print 출력은 측정에서 제외)
+            def simulate():
+                run_simulation(game_id, goal, obs_total, precomputed_data=entry)
+            stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+            try:
+                results[f"run_simulation/{key}/cold"] = _min_ms(simulate, repeat, setup=_clear_serving_caches)
+                results[f"run_simulation/{key}/warm"] = _min_ms(simulate, repeat * 10)
+            finally:
+                sys.stdout.close()
+                sys.stdout = stdout
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold_pct: float) -> list:
+    """기준선 대비 회귀 항목 [(이름, 기준선 ms, 현재 ms, 변화 %)] (변화율 내림차순)"""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None or max(base, current) < NOISE_FLOOR_MS:
+            continue
+        change = (current - base) / base * 100.0 if base > 0 else float("inf")
+        if change > threshold_pct and current - base >= MIN_DELTA_MS:
+            regressions.append((name, base, current, change))
+    return sorted(regressions, key=lambda r: -r[3])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="연산 경로 마이크로 벤치마크")
+    parser.add_argument("--game-id", type=int, nargs="+", default=sorted(GAME_TABLE), help="게임 ID 목록")
+    parser.add_argument("--goal-range", type=int, nargs=2, default=[1, 21], metavar=("START", "STOP"),
+                        help="goal 범위 [START, STOP)")
+    parser.add_argument("--quick", action="store_true", help="goal 1, 10, 20만 측정")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="측정 반복 횟수 (최솟값 사용)")
+    parser.add_argument("--n-sims", type=int, default=10_000, help="sample_total_draws 시뮬레이션 횟수")
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="비교할 기준선 JSON")
+    parser.add_argument("--save-baseline", action="store_true", help="결과를 기준선으로 저장 (비교 생략)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD_PCT, help="회귀 임계값 (%%)")
+    args = parser.parse_args()
+
+    goals = [1, 10, 20] if args.quick else list(range(*args.goal_range))
+    t0 = time.perf_counter()
+    results = run_benchmarks(args.game_id, goals, args.repeat, args.n_sims)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+            "n_sims": args.n_sims,
+            "elapsed_s": round(time.perf_counter() - t0, 1),
+        },
+        "results_ms": {name: round(ms, 4) for name, ms in results.items()},
+    }
+    print(f"{len(results)} benchmarks in {report['meta']['elapsed_s']}s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved results to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline} (run with --save-baseline first)")
+        sys.exit(0)
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)["results_ms"]
+    regressions = compare(report["results_ms"], baseline, args.threshold)
+    compared = sum(1 for name in results if name in baseline)
+    print(f"Compared {compared} benchmarks against {args.baseline} "
+          f"(threshold {args.threshold}% and {MIN_DELTA_MS}ms)")
+    if not regressions:
+        print("No regressions")
+        sys.exit(0)
+
+    print("| benchmark | baseline ms | current ms | change |")
+    print("|-----------|-------------|------------|--------|")
+    for name, base, current, change in regressions:
+        print(f"| {name} | {base:.3f} | {current:.3f} | +{change:.1f}% |")
+    sys.exit(1)
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+로컬 부하 생성기 (배포 없이 entry.Default.fetch 측정)
+
+tools/local의 workers 대역 + 파일 기반 ASSETS + 지연 주입 메모리 KV 위에서
+asyncio로 동시 요청을 보내고 엔드포인트별 RPS, 지연(p50/p95/p99), 요청당 CPU 시간(p50/p95/p99)과
+데이터 계층별(memory/cache/assets/kv) hit/miss를 출력합니다.
+CPU 시간은 각 요청 코루틴이 실제로 실행된 구간(await로 양보한 시간 제외)의 process_time 합입니다.
+
+실행 (저장소 루트에서):
+    python tools/loadgen.py
+    python tools/loadgen.py --requests 5000 --concurrency 32 --kv-latency-ms 10 --mix simulate=8,quantiles=2
+    python tools/loadgen.py --output loadgen.json
+    python tools/loadgen.py --memory --requests 500      # span별 피크/잔존 메모리 (tracemalloc, 순차 실행)
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "local"))
+
+import bindings  # noqa: E402
+from workers import Request  # noqa: E402
+
+BASE_URL = "https://local.test"
+DEFAULT_MIX = "simulate=6,batch=1,quantiles=2,plan=1,health=1,static=1"
+
+
+# ---------- 요청 시나리오 ----------
+def _simulate(rng):
+    goal = rng.randint(1, 20)
+    body = {"GAME_ID": rng.choice((1, 2)), "GOAL": goal, "OBS_TOTAL": rng.randint(goal * 30, goal * 110)}
+    return "POST", "/api/simulate", body
+
+
+def _simulate_get(rng):
+    goal = rng.randint(1, 20)
+    return "GET", f"/api/simulate?game={rng.choice((1, 2))}&goal={goal}&obs={rng.randint(goal * 30, goal * 110)}", None
+
+
+def _batch(rng):
+    queries = []
+    for _ in range(20):
+        goal = rng.randint(1, 20)
+        queries.append({"GAME_ID": rng.choice((1, 2)), "GOAL": goal, "OBS_TOTAL": rng.randint(goal * 30, goal * 110)})
+    return "POST", "/api/simulate/batch", {"queries": queries}
+
+
+def _quantiles(rng):
+    return "GET", f"/api/quantiles?game={rng.choice((1, 2))}&goal={rng.randint(1, 20)}&q=0.5,0.9,0.99", None
+
+
+def _plan(rng):
+    return "GET", f"/api/plan?game={rng.choice((1, 2))}&budget={rng.randint(100, 1500)}&target=0.9", None
+
+
+def _health(rng):
+    return "GET", "/api/health", None
+
+
+def _static(rng):
+    return "GET", rng.choice(("/", "/app.js", "/styles.css")), None
+
+
+SCENARIOS = {
+    "simulate": _simulate,
+    "simulate_get": _simulate_get,
+    "batch": _batch,
+    "quantiles": _quantiles,
+    "plan": _plan,
+    "health": _health,
+    "static": _static,
+}
+
+
+def parse_mix(spec: str):
+    """"simulate=6,plan=1" → ([시나리오 이름], [가중치])"""
+    names, weights = [], []
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario: {name} (choose from {', '.join(SCENARIOS)})")
+        names.append(name)
+        weights.append(float(weight or 1))
+    return names, weights
+
+
+# ---------- 요청당 CPU 시간 ----------
+class _CpuTimed:
+    """코루틴의 각 실행 구간(send/throw)마다 process_time을 재서 합산하는 awaitable"""
+
+    def __init__(self, coro):
+        self.coro = coro
+        self.cpu_s = 0.0
+
+    def __await__(self):
+        send, error = None, None
+        while True:
+            t0 = time.process_time()
+            try:
+                step = self.coro.throw(error) if error is not None else self.coro.send(send)
+            except StopIteration as done:
+                self.cpu_s += time.process_time() - t0
+                return done.value
+            self.cpu_s += time.process_time() - t0
+            try:
+                send, error = (yield step), None
+            except BaseException as e:  # 취소 등은 코루틴에 그대로 전달
+                send, error = None, e
+
+
+# ---------- 부하 생성 ----------
+async def run_load(worker, names, weights, total: int, concurrency: int, seed: int, warmup: int):
+    """총 total개의 요청을 concurrency개 워커로 전송 → (엔드포인트별 샘플, 경과 시간 s)"""
+    rng = random.Random(seed)
+    plan = [SCENARIOS[rng.choices(names, weights)[0]](rng) for _ in range(warmup + total)]
+    samples = {}
+
+    async def send(method, path, body):
+        request = Request(BASE_URL + path, method=method,
+                          body=json.dumps(body) if body is not None else None)
+        timed = _CpuTimed(worker.fetch(request))
+        t0 = time.perf_counter()
+        response = await timed
+        return response.status, (time.perf_counter() - t0) * 1000, timed.cpu_s * 1000
+
+    # 워밍업: isolate 캐시를 채운 뒤 측정 (콜드 스타트는 tools/measure_startup.py)
+    for method, path, body in plan[:warmup]:
+        await send(method, path, body)
+
+    queue = iter(plan[warmup:])
+
+    async def client():
+        for method, path, body in queue:
+            status, latency_ms, cpu_ms = await send(method, path, body)
+            endpoint = f"{method} {path.split('?')[0]}"
+            bucket = samples.setdefault(endpoint, {"latency": [], "cpu": [], "errors": 0})
+            bucket["latency"].append(latency_ms)
+            bucket["cpu"].append(cpu_ms)
+            if status >= 400:
+                bucket["errors"] += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    await worker.ctx.drain()
+    return samples, elapsed
+
+
+def _pct(values, p: float) -> float:
+    values = sorted(values)
+    rank = max(1, -(-len(values) * p // 100))
+    return values[int(rank) - 1]
+
+
+def summarize(samples, elapsed: float):
+    """엔드포인트별 {count, errors, rps, latency p50/p95/p99, cpu p50/p95/p99}"""
+    rows = {}
+    all_latency, all_cpu, errors = [], [], 0
+    for endpoint, bucket in sorted(samples.items()):
+        latency, cpu = bucket["latency"], bucket["cpu"]
+        all_latency += latency
+        all_cpu += cpu
+        errors += bucket["errors"]
+        rows[endpoint] = _row(latency, cpu, bucket["errors"], elapsed)
+    rows["ALL"] = _row(all_latency, all_cpu, errors, elapsed)
+    return rows
+
+
+def _row(latency, cpu, errors, elapsed):
+    return {
+        "count": len(latency),
+        "errors": errors,
+        "rps": len(latency) / elapsed if elapsed else 0.0,
+        "latency_ms": {f"p{p}": round(_pct(latency, p), 3) for p in (50, 95, 99)},
+        "cpu_ms": {f"p{p}": round(_pct(cpu, p), 3) for p in (50, 95, 99)},
+        "cpu_mean_ms": round(statistics.fmean(cpu), 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 부하 생성기 (entry.Default.fetch)")
+    parser.add_argument("--requests", type=int, default=2000, help="측정 요청 수")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시 클라이언트 수")
+    parser.add_argument("--warmup", type=int, default=200, help="측정 전 워밍업 요청 수")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="시나리오 가중치 (예: simulate=6,plan=1)")
+    parser.add_argument("--kv-latency-ms", type=float, default=5.0, help="KV get/put 지연 주입 (ms)")
+    parser.add_argument("--assets-latency-ms", type=float, default=1.0, help="ASSETS fetch 지연 주입 (ms)")
+    parser.add_argument("--cache-latency-ms", type=float, default=0.5, help="Cache API match/put 지연 주입 (ms)")
+    parser.add_argument("--tracing", choices=("on", "off"), default="on", help="span 트레이싱 (TRACING 변수)")
+    parser.add_argument("--memory", action="store_true", help="span별 피크/잔존 메모리 측정 (MEMPROFILE 변수)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    names, weights = parse_mix(args.mix)
+    if args.memory and args.concurrency != 1:
+        # tracemalloc 수치는 프로세스 전역이라 동시 요청이 섞이면 span별 값이 부정확
+        print("--memory: running with concurrency=1")
+        args.concurrency = 1
+    worker = bindings.make_worker(kv_latency_ms=args.kv_latency_ms, assets_latency_ms=args.assets_latency_ms,
+                                  cache_latency_ms=args.cache_latency_ms,
+                                  TRACING="1" if args.tracing == "on" else "0",
+                                  MEMPROFILE="1" if args.memory else "0")
+
+    # 서빙 코드의 요청 로그(print)는 측정에서 제외
+    stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+    try:
+        samples, elapsed = asyncio.run(run_load(worker, names, weights, args.requests,
+                                                args.concurrency, args.seed, args.warmup))
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    rows = summarize(samples, elapsed)
+    print(f"{args.requests} requests, concurrency={args.concurrency}, kv latency={args.kv_latency_ms}ms, "
+          f"assets latency={args.assets_latency_ms}ms, elapsed={elapsed:.2f}s")
+    print("| endpoint | count | err | RPS | lat p50 | lat p95 | lat p99 | cpu p50 | cpu p95 | cpu p99 |")
+    print("|----------|-------|-----|-----|---------|---------|---------|---------|---------|---------|")
+    for endpoint, row in rows.items():
+        lat, cpu = row["latency_ms"], row["cpu_ms"]
+        print(f"| {endpoint} | {row['count']} | {row['errors']} | {row['rps']:.1f} | "
+              f"{lat['p50']:.2f} | {lat['p95']:.2f} | {lat['p99']:.2f} | "
+              f"{cpu['p50']:.3f} | {cpu['p95']:.3f} | {cpu['p99']:.3f} |")
+
+    from logic import datasource
+    tiers = datasource.stats()
+    print("\n| tier | hits | misses | hit rate |")
+    print("|------|------|--------|----------|")
+    for tier in datasource.TIERS:
+        entry = tiers[tier]
+        rate = "-" if entry["hit_rate"] is None else f"{entry['hit_rate']:.1%}"
+        print(f"| {tier} | {entry['hits']} | {entry['misses']} | {rate} |")
+    print(f"refresh: {tiers['refresh']}")
+
+    memory = {}
+    if args.memory:
+        from logic import tracing
+        memory = tracing.memory_stats()
+        print("\n| span | count | peak KB max | peak KB avg | retained KB max | retained KB avg |")
+        print("|------|-------|-------------|-------------|-----------------|-----------------|")
+        for name, entry in memory.items():
+            print(f"| {name} | {entry['count']} | {entry['peak_kb_max']:.1f} | {entry['peak_kb_avg']:.1f} | "
+                  f"{entry['retained_kb_max']:.1f} | {entry['retained_kb_avg']:.1f} |")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"config": vars(args), "elapsed_s": elapsed, "endpoints": rows, "tiers": tiers,
+                       "memory": memory}, f, indent=2)
+        print(f"Saved results to {args.output}")
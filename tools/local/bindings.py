@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+로컬 실행용 바인딩 대역 (ASSETS, GLOBAL_STORE, ctx, Cache API) + entry.Default 생성
+
+    import bindings
+    worker = bindings.make_worker(kv_latency_ms=5)
+    response = await worker.fetch(workers.Request("https://local/api/health"))
+    await worker.ctx.drain()   # waitUntil로 넘긴 백그라운드 작업 완료 대기
+
+tools/local과 src를 sys.path에 넣은 뒤 import해야 합니다 (setup_path()).
+"""
+import asyncio
+import mimetypes
+import os
+import sys
+
+TOOLS_LOCAL = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(os.path.dirname(TOOLS_LOCAL))
+ASSET_ROOT = os.path.join(ROOT, "assets")
+
+
+def setup_path() -> None:
+    """`workers` 대역과 src를 import 경로 앞에 추가"""
+    for path in (os.path.join(ROOT, "src"), TOOLS_LOCAL):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+setup_path()
+
+from workers import Response, request_path  # noqa: E402
+
+
+class FileAssets:
+    """assets/ 디렉터리를 제공하는 ASSETS 바인딩 (요청당 지연 주입 가능)"""
+
+    def __init__(self, root: str = ASSET_ROOT, latency_ms: float = 0.0):
+        self.root = os.path.realpath(root)
+        self.latency_ms = latency_ms
+        self.fetches = 0
+
+    async def fetch(self, request) -> Response:
+        self.fetches += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+        path = os.path.realpath(os.path.join(self.root, request_path(request).lstrip("/")))
+        if not path.startswith(self.root + os.sep) or not os.path.isfile(path):
+            return Response("Not Found", status=404)
+        with open(path, 'rb') as f:
+            body = f.read()
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        return Response(body, headers={"Content-Type": content_type})
+
+
+class MemoryKV:
+    """메모리 KV 바인딩 (get/put마다 지연 주입 가능)"""
+
+    def __init__(self, latency_ms: float = 0.0, data=None):
+        self.latency_ms = latency_ms
+        self.data = dict(data or {})
+        self.gets = 0
+        self.puts = 0
+
+    async def _delay(self) -> None:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+    async def get(self, key, type=None):  # noqa: A002 (KV API 인자 이름)
+        self.gets += 1
+        await self._delay()
+        return self.data.get(key)
+
+    async def put(self, key, value, **options) -> None:
+        self.puts += 1
+        await self._delay()
+        self.data[key] = value
+
+
+class MemoryCache:
+    """Cache API(caches.default) 대역 — logic.edge_cache 백엔드 (max-age는 무시, 항상 보관)"""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def match(self, url: str):
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        entry = self.entries.get(url)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    async def put(self, url: str, body: bytes, headers) -> None:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        self.entries[url] = (bytes(body), dict(headers))
+
+
+class Env:
+    """wrangler.toml 바인딩/변수 묶음"""
+
+    def __init__(self, assets=None, store=None, **variables):
+        self.ASSETS = assets if assets is not None else FileAssets()
+        self.GLOBAL_STORE = store if store is not None else MemoryKV()
+        for key, value in variables.items():
+            setattr(self, key, value)
+
+
+class Context:
+    """ctx.waitUntil 대역 (넘겨받은 작업을 모아두고 drain()으로 대기)"""
+
+    def __init__(self):
+        self.pending = []
+
+    def waitUntil(self, task) -> None:  # noqa: N802 (Workers API 이름)
+        self.pending.append(asyncio.ensure_future(task))
+
+    async def drain(self) -> None:
+        while self.pending:
+            tasks, self.pending = self.pending, []
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def make_worker(kv_latency_ms: float = 0.0, assets_latency_ms: float = 0.0, cache_latency_ms: float = 0.0,
+                **variables):
+    """로컬 바인딩을 붙인 entry.Default 인스턴스 생성 (Cache API 대역은 worker.cache)"""
+    import entry
+    from logic import edge_cache
+
+    env = Env(FileAssets(latency_ms=assets_latency_ms), MemoryKV(latency_ms=kv_latency_ms), **variables)
+    worker = entry.Default(Context(), env)
+    worker.cache = MemoryCache(latency_ms=cache_latency_ms)
+    edge_cache.set_backend(worker.cache)
+    return worker
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+로컬 실행용 `workers` 모듈 대역 (Cloudflare Python Workers SDK의 필요한 부분만)
+
+entry.py가 쓰는 WorkerEntrypoint / Request / Response만 순수 Python으로 흉내냅니다.
+tools/local을 sys.path 앞에 두면 `from workers import ...`가 이 모듈을 가져옵니다.
+"""
+import json
+from urllib.parse import urlparse
+
+
+class Headers:
+    """대소문자 구분 없는 헤더 (JS Headers의 get/set/has/items)"""
+
+    def __init__(self, init=None):
+        self._items = {}
+        for key, value in (dict(init or {})).items():
+            self.set(key, value)
+
+    def get(self, key, default=None):
+        item = self._items.get(key.lower())
+        return item[1] if item else default
+
+    def set(self, key, value) -> None:
+        self._items[key.lower()] = (key, str(value))
+
+    def has(self, key) -> bool:
+        return key.lower() in self._items
+
+    def items(self):
+        return [item for item in self._items.values()]
+
+    def __contains__(self, key) -> bool:
+        return self.has(key)
+
+
+class _Body:
+    """요청/응답 공통 본문 읽기 (bytes / text / json)"""
+
+    def _raw(self) -> bytes:
+        body = self._body
+        if body is None:
+            return b""
+        return body.encode("utf-8") if isinstance(body, str) else bytes(body)
+
+    async def bytes(self) -> bytes:
+        return self._raw()
+
+    async def text(self) -> str:
+        return self._raw().decode("utf-8")
+
+    async def json(self):
+        return json.loads(self._raw())
+
+
+class Request(_Body):
+    def __init__(self, url: str, method: str = "GET", headers=None, body=None):
+        self.url = url
+        self.method = method.upper()
+        self.headers = Headers(headers)
+        self._body = body
+
+
+class _JsonMethod:
+    """Response.json(data) 는 생성자, response.json() 은 본문 파싱 (SDK/JS Response와 같은 사용법)"""
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return owner._from_json
+        return instance._read_json
+
+
+class Response(_Body):
+    def __init__(self, body=None, status: int = 200, headers=None):
+        self._body = body
+        self.status = status
+        self.headers = Headers(headers)
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    json = _JsonMethod()
+
+    async def _read_json(self):
+        return json.loads(self._raw())
+
+    @classmethod
+    def _from_json(cls, data, status: int = 200, headers=None):
+        merged = {"Content-Type": "application/json"}
+        merged.update(headers or {})
+        return cls(json.dumps(data), status=status, headers=merged)
+
+
+class WorkerEntrypoint:
+    def __init__(self, ctx=None, env=None):
+        self.ctx = ctx
+        self.env = env
+
+
+def request_path(request: Request) -> str:
+    """요청 URL의 경로 부분"""
+    return urlparse(request.url).path
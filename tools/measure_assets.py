@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+데이터 에셋 압축 변형 비교 (전송 + 해제 + 파싱 시간)
+
+assets/data/manifest.json의 파일마다 원본 / .gz / .br 변형의
+크기, 해제 시간, 파싱 시간을 측정하고 대역폭 가정(--mbps)으로 전송 시간을 더해 비교합니다.
+결과로 loader.COMPRESSED_FETCH_MIN_BYTES 임계값을 정합니다.
+
+실행 (저장소 루트에서):
+    python tools/measure_assets.py
+    python tools/measure_assets.py --mbps 50 --repeat 200
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from logic.loader import COMPRESSED_FETCH_MIN_BYTES, MANIFEST_NAME, decompress_variant  # noqa: E402
+from logic.packed import PackedReader  # noqa: E402
+
+ASSET_DIR = os.path.join(ROOT, "assets", "data")
+SUFFIX = {"br": ".br", "gzip": ".gz"}
+
+
+def _median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def _parse(name: str, raw: bytes) -> None:
+    if name.endswith(".json"):
+        json.loads(raw)
+    else:
+        reader = PackedReader(raw)
+        reader.read(reader.goals[-1])
+
+
+def measure(mbps: float, repeat: int):
+    """manifest의 모든 파일에 대해 변형별 (크기, 전송, 해제, 파싱, 합계) 측정"""
+    with open(os.path.join(ASSET_DIR, MANIFEST_NAME), 'r') as f:
+        manifest = json.load(f)
+
+    bytes_per_ms = mbps * 1e6 / 8 / 1000
+    rows = []
+    for name, info in sorted(manifest["files"].items()):
+        with open(os.path.join(ASSET_DIR, name), 'rb') as f:
+            raw = f.read()
+        parse_ms = _median_ms(lambda: _parse(name, raw), repeat)
+
+        variants = [("plain", len(raw), 0.0)]
+        for encoding in info["encodings"]:
+            with open(os.path.join(ASSET_DIR, name + SUFFIX[encoding]), 'rb') as f:
+                packed = f.read()
+            decode_ms = _median_ms(lambda: decompress_variant(encoding, packed), repeat)
+            variants.append((encoding, len(packed), decode_ms))
+
+        for encoding, size, decode_ms in variants:
+            transfer_ms = size / bytes_per_ms
+            rows.append((name, encoding, size, transfer_ms, decode_ms, parse_ms,
+                         transfer_ms + decode_ms + parse_ms))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="데이터 에셋 압축 변형 비교")
+    parser.add_argument("--mbps", type=float, default=100.0, help="가정 전송 대역폭 (Mbit/s)")
+    parser.add_argument("--repeat", type=int, default=100, help="측정 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--all", action="store_true", help="샤드 전체 출력 (기본: 샤드는 game*/1, 20만)")
+    args = parser.parse_args()
+
+    rows = measure(args.mbps, args.repeat)
+    print(f"Assumed bandwidth: {args.mbps} Mbit/s, COMPRESSED_FETCH_MIN_BYTES={COMPRESSED_FETCH_MIN_BYTES}")
+    print("| file | variant | bytes | transfer ms | decode ms | parse ms | total ms |")
+    print("|------|---------|-------|-------------|-----------|----------|----------|")
+    for name, encoding, size, transfer_ms, decode_ms, parse_ms, total_ms in rows:
+        if not args.all and "/" in name and not name.endswith(("/1.bin", "/20.bin")):
+            continue
+        print(f"| {name} | {encoding} | {size:,} | {transfer_ms:.3f} | {decode_ms:.3f} | {parse_ms:.3f} | {total_ms:.3f} |")
+
+    # 파일별 최선 변형 요약
+    best = {}
+    for name, encoding, size, *_, total_ms in rows:
+        if name not in best or total_ms < best[name][1]:
+            best[name] = (encoding, total_ms)
+    wins = sum(1 for encoding, _ in best.values() if encoding != "plain")
+    print(f"\nCompressed variant is fastest for {wins}/{len(best)} files")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+콜드 스타트 vs 첫 요청 vs warm 요청 시간 비교
+
+매 실행마다 새 Python 프로세스(= 새 isolate 가정)에서 tools/local 대역(workers, ASSETS)으로
+  1. init: entry 모듈 import (서빙 모듈 전체 + import 시 만드는 정적 테이블, 배포 시 메모리 스냅샷에 포함되는 부분)
+  2. first: 첫 요청 Default.fetch (ASSETS 샤드 로드 + 디코딩 + 인덱스 구축 + SVG 템플릿 생성)
+  3. warm: 같은 (game, goal)의 두 번째 요청 (isolate 캐시 적중)
+을 측정해 중앙값을 출력합니다.
+배포된 Worker는 import를 배포 시 메모리 스냅샷 생성 때 실행하므로 init은 이 도구로만 측정합니다.
+/api/health의 startup 항목에는 isolate별 first_request_ms / warm_avg_ms만 있습니다.
+
+실행 (저장소 루트에서):
+    python tools/measure_startup.py
+    python tools/measure_startup.py --runs 20 --game-id 2 --goal 15
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _child(game_id: int, goal: int, obs_total: int) -> dict:
+    """새 프로세스 안에서 init / first / warm 시간 측정 (entry.Default.fetch 경유)"""
+    sys.path.insert(0, os.path.join(ROOT, "tools", "local"))
+    import bindings
+    from workers import Request
+
+    t0 = time.perf_counter()
+    import entry  # noqa: F401 (배포 Worker의 모듈 초기화와 같은 import 집합)
+    init_ms = (time.perf_counter() - t0) * 1000
+
+    worker = bindings.make_worker()
+    body = json.dumps({"GAME_ID": game_id, "GOAL": goal, "OBS_TOTAL": obs_total})
+
+    async def request() -> float:
+        t = time.perf_counter()
+        response = await worker.fetch(Request("https://local.test/api/simulate", method="POST", body=body))
+        elapsed = (time.perf_counter() - t) * 1000
+        if response.status != 200:
+            raise RuntimeError(f"/api/simulate returned {response.status}")
+        await worker.ctx.drain()
+        return elapsed
+
+    async def run():
+        return await request(), await request()
+
+    # 요청 로그(print)는 결과 JSON 줄과 섞이지 않도록 버림
+    stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+    try:
+        first_ms, warm_ms = asyncio.run(run())
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    return {"init_ms": init_ms, "first_ms": first_ms, "warm_ms": warm_ms}
+
+
+def measure(runs: int, game_id: int, goal: int, obs_total: int) -> dict:
+    """runs개의 새 프로세스에서 측정한 단계별 중앙값"""
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", "--game-id", str(game_id),
+             "--goal", str(goal), "--obs-total", str(obs_total)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+    return {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="콜드 스타트 vs 첫 요청 시간 비교")
+    parser.add_argument("--runs", type=int, default=10, help="새 프로세스 실행 횟수 (중앙값 사용)")
+    parser.add_argument("--game-id", type=int, default=1)
+    parser.add_argument("--goal", type=int, default=7)
+    parser.add_argument("--obs-total", type=int, default=888)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_child(args.game_id, args.goal, args.obs_total)))
+        sys.exit(0)
+
+    result = measure(args.runs, args.game_id, args.goal, args.obs_total)
+    print(f"game_id={args.game_id}, goal={args.goal}, runs={args.runs} (median)")
+    print("| phase | ms |")
+    print("|-------|----|")
+    print(f"| init (import entry + static tables) | {result['init_ms']:.2f} |")
+    print(f"| first request | {result['first_ms']:.2f} |")
+    print(f"| warm request | {result['warm_ms']:.2f} |")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+히스토그램 SVG path 인코딩 시각적 동등성 확인 (이전 절대좌표 L 경로 vs 현재 h/v 경로)
+
+모든 (game, goal) 분포에 대해 서빙과 같은 bins로 두 path를 만들고,
+픽셀 격자에 래스터화(픽셀 중심이 영역 안이면 채움)해 서로 다른 픽셀 비율을 비교합니다.
+함께 image_svg 전체 크기(이전 / 현재)를 출력합니다.
+다른 픽셀 비율이 --tolerance(%)를 넘는 분포가 있으면 종료 코드 1.
+
+실행 (저장소 루트에서):
+    python tools/svg_equivalence.py
+    python tools/svg_equivalence.py --tolerance 0.5 --obs 300
+"""
+import argparse
+import json
+import os
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from logic.compute import (  # noqa: E402
+    GAME_TABLE, PLAN_GOALS, SVG_H, SVG_W, _hist_path, hist_bins, hist_title,
+    make_hist_svg_freq, rebin_freq, split_precomputed,
+)
+from logic.compute_not_used import hist_path_absolute  # noqa: E402
+from logic.packed import PackedReader  # noqa: E402
+
+ASSET_DIR = os.path.join(ROOT, "assets", "data")
+_TOKEN = re.compile(r"[MLHVZhvl]|-?\d+(?:\.\d+)?")
+
+
+def _vertices(d: str):
+    """path d (M/L/H/V/Z + 상대 h/v/l) → 꼭짓점 목록"""
+    points, x, y = [], 0.0, 0.0
+    tokens = _TOKEN.findall(d)
+    i = 0
+    while i < len(tokens):
+        cmd = tokens[i]
+        i += 1
+        if cmd == "Z":
+            continue
+        if cmd in "ML":
+            x, y = float(tokens[i]), float(tokens[i + 1]); i += 2
+        elif cmd == "l":
+            x, y = x + float(tokens[i]), y + float(tokens[i + 1]); i += 2
+        elif cmd == "H":
+            x = float(tokens[i]); i += 1
+        elif cmd == "V":
+            y = float(tokens[i]); i += 1
+        elif cmd == "h":
+            x += float(tokens[i]); i += 1
+        elif cmd == "v":
+            y += float(tokens[i]); i += 1
+        points.append((x, y))
+    return points
+
+
+def rasterize(d: str):
+    """계단형 히스토그램 path → 픽셀 열마다 채워진 최상단 행 (채움 없음 = SVG_H)
+
+    바닥선 위의 계단 다각형이므로 열 중심을 덮는 수평 변 중 가장 위(y 최소)가 채움 경계입니다.
+    """
+    points = _vertices(d)
+    tops = [SVG_H] * SVG_W
+    for (x0, y0), (x1, y1) in zip(points, points[1:]):
+        if y0 != y1 or x0 == x1:
+            continue
+        lo, hi = min(x0, x1), max(x0, x1)
+        for col in range(max(0, int(lo)), min(SVG_W, int(hi) + 1)):
+            if lo <= col + 0.5 < hi:
+                # 픽셀 중심(row + 0.5)이 y0 아래면 채움 → 첫 채움 행
+                tops[col] = min(tops[col], max(0, int(y0 + 0.5)))
+    return tops
+
+
+def compare(old_d: str, new_d: str):
+    """(다른 픽셀 수, 이전 채움 픽셀 수)"""
+    # 바닥선(y 최대)보다 아래는 채움 없음과 같음
+    bottom_row = int(max(y for _, y in _vertices(old_d)) + 0.5)
+    old_tops = [min(t, bottom_row) for t in rasterize(old_d)]
+    new_tops = [min(t, bottom_row) for t in rasterize(new_d)]
+    diff = sum(abs(a - b) for a, b in zip(old_tops, new_tops))
+    filled = sum(max(0, bottom_row - t) for t in old_tops)
+    return diff, filled
+
+
+def distributions():
+    """(game_id, goal, min_val, freq) — game{N}/{goal}.bin 샤드"""
+    with open(os.path.join(ASSET_DIR, "manifest.json"), 'r') as f:
+        manifest = json.load(f)
+    for game_id in GAME_TABLE:
+        for goal in PLAN_GOALS:
+            name = f"game{game_id}/{goal}.bin"
+            if name not in manifest["files"]:
+                continue
+            with open(os.path.join(ASSET_DIR, name), 'rb') as f:
+                entry = PackedReader(f.read()).read(goal)
+            yield (game_id, goal, *split_precomputed(entry))
+
+
+def legacy_svg(min_val, freq, obs_total, bins, title, new_path: str, old_path: str) -> str:
+    """현재 SVG에서 path d만 이전 인코딩으로 바꾼 문자열 (크기 비교용)"""
+    svg = make_hist_svg_freq(min_val, freq, obs_total, bins=bins, title=title)
+    return svg.replace(f'd="{new_path}"', f'd="{old_path}"', 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="히스토그램 path 인코딩 시각적 동등성 확인")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="허용 다른 픽셀 비율 (%%)")
+    parser.add_argument("--obs", type=int, default=None, help="관측치 (기본: 분포 중앙 부근)")
+    args = parser.parse_args()
+
+    print("| game | goal | bins | diff px | filled px | diff % | svg bytes old | svg bytes new | saved % |")
+    print("|------|------|------|---------|-----------|--------|---------------|---------------|---------|")
+    failed = 0
+    total_old = total_new = 0
+    for game_id, goal, min_val, freq in distributions():
+        bins = hist_bins(goal)
+        x_min, x_max, counts, n = rebin_freq(min_val, freq, bins)
+        width = (x_max - x_min) / float(len(counts))
+        density = [c / (n * width) for c in counts]
+        old_path, new_path = hist_path_absolute(density), _hist_path(density)
+
+        diff, filled = compare(old_path, new_path)
+        ratio = 100.0 * diff / max(1, filled)
+        if ratio > args.tolerance:
+            failed += 1
+
+        obs_total = args.obs if args.obs is not None else int((x_min + x_max) / 2)
+        title = hist_title(goal, n)
+        new_svg = make_hist_svg_freq(min_val, freq, obs_total, bins=bins, title=title)
+        old_svg = legacy_svg(min_val, freq, obs_total, bins, title, new_path, old_path)
+        total_old += len(old_svg)
+        total_new += len(new_svg)
+        print(f"| {game_id} | {goal} | {len(counts)} | {diff} | {filled} | {ratio:.3f} | "
+              f"{len(old_svg)} | {len(new_svg)} | {100.0 * (1 - len(new_svg) / len(old_svg)):.1f} |")
+
+    print(f"\nimage_svg total: {total_old} → {total_new} bytes "
+          f"({100.0 * (1 - total_new / max(1, total_old)):.1f}% smaller)")
+    if failed:
+        print(f"{failed} distribution(s) exceed {args.tolerance}% differing pixels")
+        sys.exit(1)
+    print(f"All distributions within {args.tolerance}% differing pixels")